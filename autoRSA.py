@@ -27,9 +27,13 @@ try:
     from firstradeAPI import *
     from helperAPI import (
         ThreadHandler,
+        browser_pool,
         check_package_versions,
+        prewarm_broker,
         printAndDiscord,
+        quote_cache,
         stockOrder,
+        timing_report,
         updater,
     )
     from publicAPI import *
@@ -116,11 +120,24 @@ def nicknames(broker):
 def fun_run(orderObj: stockOrder, command, botObj=None, loop=None):
     if command in [("_init", "_holdings"), ("_init", "_transaction")]:
         totalValue = 0
+        # Start each run with fresh quotes and timings
+        quote_cache.clear()
+        timing_report.clear()
+        if command[1] == "_transaction" and loop is not None:
+            prewarm_broker("discord", measure=True)
         for broker in orderObj.get_brokers():
             if broker in orderObj.get_notbrokers():
                 continue
             broker = nicknames(broker)
             first_command, second_command = command
+            # Let brokers skip fetching balances that a transaction won't use
+            init_args = {}
+            if broker.lower() in ["public", "schwab", "tastytrade", "tradier"]:
+                init_args["mode"] = second_command.strip("_")
+            if second_command == "_transaction":
+                # Connect to order hosts while the broker logs in, measuring
+                # how much connection setup that removes
+                prewarm_broker(broker, measure=True)
             try:
                 # Initialize broker
                 fun_name = broker + first_command
@@ -149,7 +166,8 @@ def fun_run(orderObj: stockOrder, command, botObj=None, loop=None):
                 ]:
                     # Requires bot object and loop
                     orderObj.set_logged_in(
-                        globals()[fun_name](botObj=botObj, loop=loop), broker
+                        globals()[fun_name](botObj=botObj, loop=loop, **init_args),
+                        broker,
                     )
                 elif broker.lower() in ["chase", "fidelity", "sofi", "vanguard"]:
                     fun_name = broker + "_run"
@@ -171,7 +189,7 @@ def fun_run(orderObj: stockOrder, command, botObj=None, loop=None):
                             + ": Function did not complete successfully."
                         )
                 else:
-                    orderObj.set_logged_in(globals()[fun_name](), broker)
+                    orderObj.set_logged_in(globals()[fun_name](**init_args), broker)
 
                 print()
                 if broker.lower() not in ["chase", "fidelity", "sofi", "vanguard"]:
@@ -187,6 +205,9 @@ def fun_run(orderObj: stockOrder, command, botObj=None, loop=None):
                         globals()[fun_name](logged_in_broker, loop)
                     elif second_command == "_transaction":
                         fun_name = broker + second_command
+                        # A long login or OTP wait can let the connection go
+                        # idle, so warm it again right before orders fire
+                        prewarm_broker(broker).join()
                         globals()[fun_name](
                             logged_in_broker,
                             orderObj,
@@ -196,13 +217,14 @@ def fun_run(orderObj: stockOrder, command, botObj=None, loop=None):
                             f"All {broker.capitalize()} transactions complete",
                             loop,
                         )
-                # Add to total sum
-                totalValue += sum(
-                    account["total"]
-                    for account in orderObj.get_logged_in(broker)
-                    .get_account_totals()
-                    .values()
-                )
+                # Add to total sum, which would load deferred balances
+                if second_command == "_holdings":
+                    totalValue += sum(
+                        account["total"]
+                        for account in orderObj.get_logged_in(broker)
+                        .get_account_totals()
+                        .values()
+                    )
             except Exception as ex:
                 print(traceback.format_exc())
                 print(f"Error in {fun_name} with {broker}: {ex}")
@@ -214,6 +236,11 @@ def fun_run(orderObj: stockOrder, command, botObj=None, loop=None):
             printAndDiscord(
                 f"Total Value of All Accounts: ${format(totalValue, '0.2f')}", loop
             )
+        quote_stats = quote_cache.get_stats()
+        print(
+            f"Quote cache: {quote_stats['hits']} cached, {quote_stats['fetches']} fetched from brokers"
+        )
+        print(timing_report)
         printAndDiscord("All commands complete in all brokers", loop)
     else:
         print(f"Error: {command} is not a valid command")
@@ -342,6 +369,8 @@ if __name__ == "__main__":
             raise Exception("DISCORD_CHANNEL not found in .env file, please add it")
         DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
         DISCORD_CHANNEL = int(os.getenv("DISCORD_CHANNEL"))
+        # The bot stays up between commands, so launch browsers ahead of logins
+        browser_pool.enable_spares()
         # Initialize discord bot
         intents = discord.Intents.default()
         intents.message_content = True
@@ -0,0 +1,387 @@
+# Shared engine for BBAE and dSPAC, which run on the same backend
+# and have identical invest APIs
+
+import asyncio
+import os
+import traceback
+from io import BytesIO
+
+from dotenv import load_dotenv
+
+from helperAPI import (
+    Brokerage,
+    getOTPCodeDiscord,
+    getUserInputDiscord,
+    maskString,
+    printAndDiscord,
+    printHoldings,
+    prompt_lock,
+    run_parallel,
+    send_captcha_to_discord,
+    stockOrder,
+)
+
+
+def engine_init(broker: str, api_class, EXTERNAL=None, botObj=None, loop=None):
+    load_dotenv()
+    broker_obj = Brokerage(broker)
+    if not os.getenv(broker) and EXTERNAL is None:
+        print(f"{broker} not found, skipping...")
+        return None
+    accounts = (
+        os.environ[broker].strip().split(",")
+        if EXTERNAL is None
+        else EXTERNAL.strip().split(",")
+    )
+    print(f"Logging in to {broker}...")
+    # Log in to all credentials at once, each has its own session file
+    logins = run_parallel(
+        lambda item: engine_login(broker, api_class, *item, botObj, loop),
+        list(enumerate(accounts)),
+    )
+    for index, login_result in enumerate(logins):
+        name = f"{broker} {index + 1}"
+        if isinstance(login_result, Exception):
+            print(f"Error logging into {broker}: {login_result}")
+            traceback.print_exception(login_result)
+            continue
+        api, account_info, account_assets = login_result
+        account_number = str(account_info["Data"]["accountNumber"])
+        # Set account values
+        masked_account_number = maskString(account_number)
+        broker_obj.set_account_number(name, masked_account_number)
+        broker_obj.set_account_totals(
+            name,
+            masked_account_number,
+            float(account_assets["Data"]["totalAssets"]),
+        )
+        broker_obj.set_logged_in_object(name, api, "api")
+    print(f"Logged into {broker}!")
+    return broker_obj
+
+
+def engine_login(broker: str, api_class, index, account, botObj=None, loop=None):
+    name = f"{broker} {index + 1}"
+    user, password = account.split(":")[:2]
+    use_email = "@" in user
+    # Initialize the API object, which loads any pickled session
+    api = api_class(
+        user, password, filename=f"{broker}_{index + 1}.pkl", creds_path="./creds/"
+    )
+    account_info = session_account_info(api)
+    if account_info is None:
+        api.make_initial_request()
+        # All the rest of the requests responsible for getting authenticated
+        if not login(api, botObj, name, loop, use_email):
+            raise Exception(f"{name}: Login failed")
+        account_info = api.get_account_info()
+    else:
+        print(f"{name}: Reusing saved session")
+    account_assets = api.get_account_assets()
+    return api, account_info, account_assets
+
+
+def session_account_info(api) -> dict | None:
+    # Check whether the pickled session is still logged in
+    if not api.cookies:
+        return None
+    try:
+        account_info = api.get_account_info()
+    except Exception:
+        return None
+    if (
+        account_info.get("Outcome") != "Success"
+        or (account_info.get("Data") or {}).get("accountNumber") is None
+    ):
+        return None
+    return account_info
+
+
+def login(api, botObj, name, loop, use_email):
+    try:
+        # API call to generate the login ticket
+        if use_email:
+            ticket_response = api.generate_login_ticket_email()
+        else:
+            ticket_response = api.generate_login_ticket_sms()
+        # Ensure "Data" key exists and proceed with verification if necessary
+        if ticket_response.get("Data") is None:
+            raise Exception("Invalid response from generating login ticket")
+        # Check if SMS or CAPTCHA verification are required
+        data = ticket_response["Data"]
+        if data.get("needSmsVerifyCode", False):
+            with prompt_lock:
+                sms_and_captcha_response = handle_captcha_and_sms(
+                    api, botObj, data, loop, name, use_email
+                )
+                if not sms_and_captcha_response:
+                    raise Exception("Error solving SMS or Captcha")
+                # Get the OTP code from the user
+                if botObj is not None and loop is not None:
+                    otp_code = asyncio.run_coroutine_threadsafe(
+                        getOTPCodeDiscord(botObj, name, timeout=300, loop=loop),
+                        loop,
+                    ).result()
+                else:
+                    otp_code = input(f"{name}: Enter security code: ")
+            if otp_code is None:
+                raise Exception("No OTP code received")
+            # Login with the OTP code
+            if use_email:
+                ticket_response = api.generate_login_ticket_email(sms_code=otp_code)
+            else:
+                ticket_response = api.generate_login_ticket_sms(sms_code=otp_code)
+            if ticket_response.get("Message") == "Incorrect verification code.":
+                raise Exception("Incorrect OTP code")
+        # Handle the login ticket
+        if (
+            ticket_response.get("Data") is not None
+            and ticket_response["Data"].get("ticket") is not None
+        ):
+            ticket = ticket_response["Data"]["ticket"]
+        else:
+            print(f"{name}: Raw response object: {ticket_response}")
+            raise Exception(
+                f"Login failed. No ticket generated. Response: {ticket_response}"
+            )
+        # Login with the ticket
+        login_response = api.login_with_ticket(ticket)
+        if login_response.get("Outcome") != "Success":
+            raise Exception(f"Login failed. Response: {login_response}")
+        return True
+    except Exception as e:
+        print(f"{name}: Error in OTP login: {e}")
+        print(traceback.format_exc())
+        return False
+
+
+def handle_captcha_and_sms(api, botObj, data, loop, name, use_email):
+    try:
+        # If CAPTCHA is needed it will generate an SMS code as well
+        if data.get("needCaptchaCode", False):
+            print(f"{name}: CAPTCHA required. Requesting CAPTCHA image...")
+            sms_response = solve_captcha(api, botObj, name, loop, use_email)
+            if not sms_response:
+                raise Exception("Failure solving CAPTCHA!")
+            print(f"{name}: CAPTCHA solved. SMS response is: {sms_response}")
+        else:
+            print(f"{name}: Requesting code...")
+            sms_response = send_sms_code(api, name, use_email)
+            if not sms_response:
+                raise Exception("Unable to retrieve sms code!")
+            print(f"{name}: SMS response is: {sms_response}")
+        return True
+    except Exception as e:
+        print(f"{name}: Error in CAPTCHA or SMS: {e}")
+        print(traceback.format_exc())
+        return False
+
+
+def solve_captcha(api, botObj, name, loop, use_email):
+    try:
+        captcha_image = api.request_captcha()
+        if not captcha_image:
+            raise Exception("Unable to request CAPTCHA image, aborting...")
+        # Send the CAPTCHA image to Discord for manual input
+        print("Sending CAPTCHA to Discord for user input...")
+        file = BytesIO()
+        captcha_image.save(file, format="PNG")
+        file.seek(0)
+        # Retrieve input
+        if botObj is not None and loop is not None:
+            asyncio.run_coroutine_threadsafe(
+                send_captcha_to_discord(file),
+                loop,
+            ).result()
+            captcha_input = asyncio.run_coroutine_threadsafe(
+                getUserInputDiscord(
+                    botObj, f"{name} requires CAPTCHA input", timeout=300, loop=loop
+                ),
+                loop,
+            ).result()
+        else:
+            captcha_image.save("./captcha.png", format="PNG")
+            captcha_input = input(
+                f"{name}: CAPTCHA image saved to ./captcha.png. Please open it and type in the code: "
+            )
+        if captcha_input is None:
+            raise Exception("No CAPTCHA code found")
+        # Send the CAPTCHA to the appropriate API based on login type
+        if use_email:
+            sms_request_response = api.request_email_code(captcha_input=captcha_input)
+        else:
+            sms_request_response = api.request_sms_code(captcha_input=captcha_input)
+        if sms_request_response.get("Message") == "Incorrect verification code.":
+            raise Exception("Incorrect CAPTCHA code!")
+        return sms_request_response
+    except Exception as e:
+        print(f"{name}: Error solving CAPTCHA code: {e}")
+        print(traceback.format_exc())
+        return None
+
+
+def send_sms_code(api, name, use_email, captcha_input=None):
+    if use_email:
+        sms_code_response = api.request_email_code(captcha_input=captcha_input)
+    else:
+        sms_code_response = api.request_sms_code(captcha_input=captcha_input)
+    if sms_code_response.get("Message") == "Incorrect verification code.":
+        print(f"{name}: Incorrect CAPTCHA code, retrying...")
+        return False
+    return sms_code_response
+
+
+def engine_holdings(broker_obj: Brokerage, loop=None):
+    keys = list(broker_obj.get_account_numbers())
+    # Get holdings for all logins at once
+    positions_list = run_parallel(
+        lambda key: broker_obj.get_logged_in_objects(key, "api").get_account_holdings(),
+        keys,
+    )
+    for key, positions in zip(keys, positions_list):
+        for account in broker_obj.get_account_numbers(key):
+            try:
+                if isinstance(positions, Exception):
+                    raise positions
+                if positions.get("Data") is not None:
+                    for holding in positions["Data"]:
+                        qty = holding["CurrentAmount"]
+                        if float(qty) == 0:
+                            continue
+                        sym = holding["displaySymbol"]
+                        cp = holding["Last"]
+                        broker_obj.set_holdings(key, account, sym, qty, cp)
+            except Exception as e:
+                printAndDiscord(f"Error getting {broker_obj.get_name()} holdings: {e}")
+                print(traceback.format_exc())
+                continue
+    printHoldings(broker_obj, loop, False)
+
+
+def engine_positions(api) -> dict:
+    # Snapshot of shares held in the account by symbol, including unsellable ones
+    positions = api.get_account_holdings()
+    if positions.get("Data") is None:
+        raise Exception(positions.get("Message"))
+    return {
+        holding["displaySymbol"]: float(holding["CurrentAmount"])
+        for holding in positions["Data"]
+    }
+
+
+def engine_order(api, key, account, s, orderObj: stockOrder, held=None) -> str:
+    # Validate and place one order, returning the message to report
+    action = orderObj.get_action().lower()
+    quantity = orderObj.get_amount()
+    is_dry_run = orderObj.get_dry()
+    if action == "buy":
+        # Validate the buy transaction
+        validation_response = api.validate_buy(
+            symbol=s,
+            amount=quantity,
+            order_side=1,
+            account_number=account,
+        )
+        if validation_response["Outcome"] != "Success":
+            return f"{key} {account}: Validation failed for buying {quantity} of {s}: {validation_response['Message']}"
+        # Proceed to execute the buy if not in dry run mode
+        if not is_dry_run:
+            buy_response = api.execute_buy(
+                symbol=s,
+                amount=quantity,
+                account_number=account,
+                dry_run=is_dry_run,
+            )
+            message = buy_response["Message"]
+        else:
+            message = "Dry Run Success"
+    else:
+        # Skip accounts that don't hold enough shares
+        if isinstance(held, Exception):
+            return f"{key} {account}: Error checking holdings: {held}"
+        available_amount = held.get(s, 0)
+        if quantity > available_amount:
+            return f"{key} {account}: Not enough shares to sell {quantity} of {s}. Available: {available_amount}"
+        # Shares held can include some that can't be sold yet, so check how
+        # many are sellable before selling
+        holdings_response = api.check_stock_holdings(symbol=s, account_number=account)
+        if holdings_response["Outcome"] != "Success":
+            return f"{key} {account}: Error checking holdings: {holdings_response['Message']}"
+        available_amount = float(holdings_response["Data"]["enableAmount"])
+        if quantity > available_amount:
+            return f"{key} {account}: Not enough shares to sell {quantity} of {s}. Available: {available_amount}"
+        # Validate the sell transaction
+        validation_response = api.validate_sell(
+            symbol=s, amount=quantity, account_number=account
+        )
+        if validation_response["Outcome"] != "Success":
+            return f"{key} {account}: Validation failed for selling {quantity} of {s}: {validation_response['Message']}"
+        # Proceed to execute the sell if not in dry run mode
+        if not is_dry_run:
+            entrust_price = validation_response["Data"]["entrustPrice"]
+            sell_response = api.execute_sell(
+                symbol=s,
+                amount=quantity,
+                account_number=account,
+                entrust_price=entrust_price,
+                dry_run=is_dry_run,
+            )
+            message = sell_response["Message"]
+        else:
+            message = "Dry Run Success"
+    return f"{key}: {orderObj.get_action().capitalize()} {quantity} of {s} in {account}: {message}"
+
+
+def engine_transaction(broker_obj: Brokerage, orderObj: stockOrder, loop=None):
+    print()
+    print("==============================")
+    print(broker_obj.get_name())
+    print("==============================")
+    print()
+    action = orderObj.get_action().lower()
+    keys = list(broker_obj.get_account_numbers())
+    snapshots = {}
+    if action == "sell":
+        # Check holdings once per account and reuse them for every ticker
+        snapshots = dict(
+            zip(
+                keys,
+                run_parallel(
+                    lambda key: engine_positions(
+                        broker_obj.get_logged_in_objects(key, "api")
+                    ),
+                    keys,
+                ),
+            )
+        )
+    orders = [
+        (key, account)
+        for key in keys
+        for account in broker_obj.get_account_numbers(key)
+    ]
+    for s in orderObj.get_stocks():
+        for key in keys:
+            printAndDiscord(
+                f"{key}: {action}ing {orderObj.get_amount()} of {s}",
+                loop,
+            )
+        # Place the order in every account at once, then report in order
+        messages = run_parallel(
+            lambda item: engine_order(
+                broker_obj.get_logged_in_objects(item[0], "api"),
+                item[0],
+                item[1],
+                s,
+                orderObj,
+                snapshots.get(item[0], {}),
+            ),
+            orders,
+        )
+        for (key, account), message in zip(orders, messages):
+            if isinstance(message, Exception):
+                printAndDiscord(
+                    f"{key} {account}: Error placing order: {message}", loop
+                )
+                traceback.print_exception(message)
+                continue
+            printAndDiscord(message, loop)
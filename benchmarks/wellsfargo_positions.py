@@ -0,0 +1,160 @@
+# Compare the old per-cell Wells Fargo positions parse with wellsfargo_parse_positions
+# Run from the repository root: python benchmarks/wellsfargo_positions.py
+# Each WebDriver call is simulated with a fixed round trip delay (--latency-ms)
+# The fixture is a synthetic table in the positions layout, not a real capture,
+# so call counts follow from its row count and timings from the simulated delay
+
+import argparse
+import os
+import re
+import sys
+from html.parser import HTMLParser
+from time import perf_counter, sleep
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wellsfargoAPI import POSITIONS_SCRIPT, wellsfargo_parse_positions  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "wellsfargo_positions.html")
+
+
+class TableReader(HTMLParser):
+    # Collect the innerText of every td in the table body, row by row
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self.__in_body = False
+        self.__cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tbody":
+            self.__in_body = True
+        elif self.__in_body and tag == "tr":
+            self.rows.append([])
+        elif self.__in_body and tag == "td":
+            self.__cell = []
+        elif self.__cell is not None and tag == "br":
+            self.__cell.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "tbody":
+            self.__in_body = False
+        elif tag == "td" and self.__cell is not None:
+            self.rows[-1].append("".join(self.__cell).strip())
+            self.__cell = None
+
+    def handle_data(self, data):
+        if self.__cell is not None:
+            self.__cell.append(data.strip())
+
+
+class FakeElement:
+    # Stands in for a WebElement, each find_elements or .text is one round trip
+    def __init__(self, driver, text="", children=None):
+        self.__driver = driver
+        self.__text = text
+        self.__children = children or []
+
+    @property
+    def text(self):
+        self.__driver.round_trip()
+        return self.__text
+
+    def find_elements(self, by, value):
+        self.__driver.round_trip()
+        return self.__children
+
+
+class FakeDriver:
+    def __init__(self, rows, latency):
+        self.rows = rows
+        self.latency = latency
+        self.calls = 0
+
+    def round_trip(self):
+        self.calls += 1
+        sleep(self.latency)
+
+    def find_elements(self, by, value):
+        self.round_trip()
+        return [
+            FakeElement(self, children=[FakeElement(self, text) for text in row])
+            for row in self.rows
+        ]
+
+    def execute_script(self, script):
+        self.round_trip()
+        return [list(row) for row in self.rows]
+
+
+def old_parse(driver):
+    # The per-cell loop wellsfargo_holdings used before wellsfargo_parse_positions
+    positions = []
+    rows = driver.find_elements("css selector", "tbody tr")
+    for row in rows:
+        cells = row.find_elements("css selector", "td")
+        if len(cells) >= 9:
+            name_match = re.search(r"^[^\n]*", cells[1].text)
+            amount_match = re.search(r"-?\d+(\.\d+)?", cells[3].text.replace("\n", ""))
+            price_match = re.search(r"-?\d+(\.\d+)?", cells[4].text.replace("\n", ""))
+            name = name_match.group(0) if name_match else cells[1].text
+            amount = amount_match.group(0) if amount_match else "0"
+            price = price_match.group(0) if price_match else "0"
+            positions.append((name.strip(), float(amount), float(price)))
+    return positions
+
+
+def new_parse(driver):
+    return wellsfargo_parse_positions(driver.execute_script(POSITIONS_SCRIPT) or [])
+
+
+def time_parse(parse, rows, latency, repeat):
+    best = None
+    for _ in range(repeat):
+        driver = FakeDriver(rows, latency)
+        start = perf_counter()
+        positions = parse(driver)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return positions, driver.calls, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    reader = TableReader()
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        reader.feed(f.read())
+    rows = reader.rows
+    latency = args.latency_ms / 1000
+    old_positions, old_calls, old_time = time_parse(
+        old_parse, rows, latency, args.repeat
+    )
+    new_positions, new_calls, new_time = time_parse(
+        new_parse, rows, latency, args.repeat
+    )
+    # Both parsers must agree, except the old one read "1,250" as 1
+    mismatches = 0
+    for row, old, new in zip(
+        [row for row in rows if len(row) >= 9], old_positions, new_positions
+    ):
+        if old == new:
+            continue
+        if "," in row[3] or "," in row[4]:
+            print(f"Thousands separator fixed: {old} -> {new}")
+            continue
+        print(f"Mismatch: {old} != {new}")
+        mismatches += 1
+    if len(old_positions) != len(new_positions):
+        print(f"Row count differs: {len(old_positions)} != {len(new_positions)}")
+        mismatches += 1
+    print(f"Rows: {len(rows)}, positions: {len(new_positions)}")
+    print(f"Old per-cell parse: {old_calls} calls, {old_time * 1000:.1f}ms")
+    print(f"New single script:  {new_calls} calls, {new_time * 1000:.1f}ms")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 # Donald Ryan Gullett(MaxxRK)
 # Chase API
 
-import asyncio
 import os
 import pprint
 import traceback
@@ -12,10 +11,13 @@ from dotenv import load_dotenv
 
 from helperAPI import (
     Brokerage,
-    getOTPCodeDiscord,
+    browser_workers,
+    getOTPCode,
     printAndDiscord,
     printHoldings,
-    stockOrder
+    quote_cache,
+    run_parallel,
+    stockOrder,
 )
 
 
@@ -38,10 +40,9 @@ def chase_run(
     # Set the functions to be run
     _, second_command = command
 
-    # For each set of login info, i.e. seperate chase accounts
-    for account in accounts:
-        # Start at index 1 and go to how many logins we have
-        index = accounts.index(account) + 1
+    def chase_login(index_account):
+        # Log in and run the command for one set of login info
+        index, account = index_account
         # Receive the chase broker class object and the AllAccount object related to it
         chase_details = chase_init(
             account=account,
@@ -50,18 +51,41 @@ def chase_run(
             botObj=botObj,
             loop=loop,
         )
-        if chase_details is not None:
-            orderObj.set_logged_in(chase_details[0], "chase")
-            if second_command == "_holdings":
-                chase_holdings(chase_details[0], chase_details[1], loop=loop)
-            # Only other option is _transaction
-            else:
-                chase_transaction(
-                    chase_details[0], chase_details[1], orderObj, loop=loop
-                )
+        if chase_details is None:
+            return None
+        if second_command == "_holdings":
+            chase_holdings(chase_details[0], chase_details[1], loop=loop)
+        # Only other option is _transaction
+        else:
+            chase_transaction(chase_details[0], chase_details[1], orderObj, loop=loop)
+        return chase_details[0]
+
+    # Each set of login info, i.e. seperate chase accounts, runs its own browser
+    results = run_parallel(
+        chase_login,
+        enumerate(accounts, start=1),
+        max_workers=browser_workers(len(accounts)),
+    )
+    for index, result in enumerate(results, start=1):
+        if isinstance(result, Exception):
+            print(f"Error in Chase {index}: {result}")
+        elif result is not None:
+            orderObj.set_logged_in(result, "chase")
     return None
 
 
+def chase_quote(account_id, ch_session: session.ChaseSession, symbol: str) -> dict:
+    # Get quote fields for the shared quote cache
+    quote = symbols.SymbolQuote(
+        account_id=account_id, session=ch_session, symbol=symbol
+    )
+    return {
+        "ask": quote.ask_price,
+        "bid": quote.bid_price,
+        "last": quote.last_trade_price,
+    }
+
+
 def get_account_id(account_connectors, value):
     for key, val in account_connectors.items():
         if val[0] == value:
@@ -106,15 +130,10 @@ def chase_init(account: str, index: int, headless=True, botObj=None, loop=None):
         need_second = ch_session.login(account[0], account[1], account[2])
         # If 2FA is present, ask for code
         if need_second:
-            if botObj is None and loop is None:
-                ch_session.login_two(input("Enter code: "))
-            else:
-                sms_code = asyncio.run_coroutine_threadsafe(
-                    getOTPCodeDiscord(botObj, name, code_len=8, loop=loop), loop
-                ).result()
-                if sms_code is None:
-                    raise Exception(f"Chase {index} code not received in time...", loop)
-                ch_session.login_two(sms_code)
+            sms_code = getOTPCode(botObj, name, code_len=8, loop=loop)
+            if sms_code is None:
+                raise Exception(f"Chase {index} code not received in time...", loop)
+            ch_session.login_two(sms_code)
         # Create an AllAccounts class object using the current browser session. Holds information about all accounts
         all_accounts = ch_account.AllAccount(ch_session)
         # Get the account IDs and store in a list. The IDs are different than account numbers.
@@ -241,20 +260,22 @@ def chase_transaction(
                 account_ids = list(all_accounts.account_connectors.keys())
 
                 # Get the ask price and determine whether to use MARKET or LIMIT order
-                symbol_quote = symbols.SymbolQuote(
-                    account_id=account_ids[0], session=ch_session, symbol=ticker
+                ask_price = quote_cache.get_quote(
+                    ticker,
+                    "ask",
+                    lambda sym: chase_quote(account_ids[0], ch_session, sym),
                 )
 
                 # If it should be limit
-                if symbol_quote.ask_price < 1:
+                if ask_price < 1:
                     price_type = order.PriceType.LIMIT
-                    if symbol_quote.ask_price > 0.10:
+                    if ask_price > 0.10:
                         # Set limit price
-                        limit_price = round(symbol_quote.ask_price + 0.01, 2)
+                        limit_price = round(ask_price + 0.01, 2)
                     else:
                         # Set limit price always round up
                         factor = 10**2
-                        value = symbol_quote.ask_price * factor
+                        value = ask_price * factor
                         if value % 1 != 0:
                             value = int(value) + 1
                         limit_price = value / factor
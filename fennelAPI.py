@@ -1,4 +1,5 @@
 import asyncio
+import json
 import os
 import traceback
 
@@ -10,7 +11,8 @@ from helperAPI import (
     getOTPCodeDiscord,
     printAndDiscord,
     printHoldings,
-    stockOrder
+    run_parallel,
+    stockOrder,
 )
 
 
@@ -65,9 +67,11 @@ def fennel_init(FENNEL_EXTERNAL=None, botObj=None, loop=None):
                     raise e
             fennel_obj.set_logged_in_object(name, fb, "fb")
             account_ids = fb.get_account_ids()
-            for i, an in enumerate(account_ids):
+            summaries = run_parallel(fb.get_portfolio_summary, account_ids)
+            for i, (an, b) in enumerate(zip(account_ids, summaries)):
                 account_name = f"Account {i + 1}"
-                b = fb.get_portfolio_summary(an)
+                if isinstance(b, Exception):
+                    raise b
                 fennel_obj.set_account_number(name, account_name)
                 fennel_obj.set_account_totals(
                     name,
@@ -85,14 +89,47 @@ def fennel_init(FENNEL_EXTERNAL=None, botObj=None, loop=None):
     return fennel_obj
 
 
+def fennel_batched_holdings(obj: Fennel, account_ids: list) -> list:
+    # Ask for every account's holdings in one GraphQL request using aliases
+    single = json.loads(obj.endpoints.stock_holdings_query(""))["query"]
+    account_query = single[single.index("{") + 1 : single.rindex("}")].strip()
+    variables = {f"a{i}": account_id for i, account_id in enumerate(account_ids)}
+    query = "query BatchedPortfolioData({}) {{ {} }}".format(
+        ", ".join(f"${alias}: String!" for alias in variables),
+        " ".join(
+            f"{alias}: " + account_query.replace("$accountId", f"${alias}")
+            for alias in variables
+        ),
+    )
+    response = obj.session.post(
+        obj.endpoints.graphql,
+        headers=obj.endpoints.build_headers(obj.Bearer),
+        data=json.dumps(obj.endpoints.build_graphql_payload(query, variables)),
+    )
+    if response.status_code != 200:
+        raise Exception(
+            f"Stock Holdings Request failed with status code {response.status_code}: {response.text}"
+        )
+    data = response.json()["data"]
+    return [data[alias]["portfolio"]["bulbs"] for alias in variables]
+
+
 def fennel_holdings(fbo: Brokerage, loop=None):
     for key in fbo.get_account_numbers():
-        for account in fbo.get_account_numbers(key):
-            obj: Fennel = fbo.get_logged_in_objects(key, "fb")
-            account_id = fbo.get_logged_in_objects(key, account)
+        obj: Fennel = fbo.get_logged_in_objects(key, "fb")
+        accounts = fbo.get_account_numbers(key)
+        account_ids = [fbo.get_logged_in_objects(key, account) for account in accounts]
+        try:
+            positions_list = fennel_batched_holdings(obj, account_ids)
+        except Exception as e:
+            # Fall back to one request per account, all at once
+            print(f"{key}: Batched holdings failed, fetching per account: {e}")
+            positions_list = run_parallel(obj.get_stock_holdings, account_ids)
+        for account, positions in zip(accounts, positions_list):
             try:
+                if isinstance(positions, Exception):
+                    raise positions
                 # Get account holdings
-                positions = obj.get_stock_holdings(account_id)
                 if positions != []:
                     for holding in positions:
                         qty = holding["investment"]["ownedShares"]
@@ -110,6 +147,25 @@ def fennel_holdings(fbo: Brokerage, loop=None):
     printHoldings(fbo, loop, False)
 
 
+def fennel_order(obj: Fennel, account_id, s, orderObj: stockOrder) -> str:
+    order = obj.place_order(
+        account_id=account_id,
+        ticker=s,
+        quantity=orderObj.get_amount(),
+        side=orderObj.get_action(),
+        dry_run=orderObj.get_dry(),
+    )
+    if orderObj.get_dry():
+        message = "Dry Run Success"
+        if not order.get("dry_run_success", False):
+            message = "Dry Run Failed"
+    else:
+        message = "Success"
+        if order.get("data", {}).get("createOrder") != "pending":
+            message = order.get("data", {}).get("createOrder")
+    return message
+
+
 def fennel_transaction(fbo: Brokerage, orderObj: stockOrder, loop=None):
     print()
     print("==============================")
@@ -122,30 +178,23 @@ def fennel_transaction(fbo: Brokerage, orderObj: stockOrder, loop=None):
                 f"{key}: {orderObj.get_action()}ing {orderObj.get_amount()} of {s}",
                 loop,
             )
-            for account in fbo.get_account_numbers(key):
-                obj: Fennel = fbo.get_logged_in_objects(key, "fb")
-                account_id = fbo.get_logged_in_objects(key, account)
-                try:
-                    order = obj.place_order(
-                        account_id=account_id,
-                        ticker=s,
-                        quantity=orderObj.get_amount(),
-                        side=orderObj.get_action(),
-                        dry_run=orderObj.get_dry(),
-                    )
-                    if orderObj.get_dry():
-                        message = "Dry Run Success"
-                        if not order.get("dry_run_success", False):
-                            message = "Dry Run Failed"
-                    else:
-                        message = "Success"
-                        if order.get("data", {}).get("createOrder") != "pending":
-                            message = order.get("data", {}).get("createOrder")
+            obj: Fennel = fbo.get_logged_in_objects(key, "fb")
+            accounts = fbo.get_account_numbers(key)
+            # Place the order in every account at once, then report in order
+            messages = run_parallel(
+                lambda account: fennel_order(
+                    obj, fbo.get_logged_in_objects(key, account), s, orderObj
+                ),
+                accounts,
+            )
+            for account, message in zip(accounts, messages):
+                if isinstance(message, Exception):
                     printAndDiscord(
-                        f"{key}: {orderObj.get_action()} {orderObj.get_amount()} of {s} in {account}: {message}",
-                        loop,
+                        f"{key} {account}: Error placing order: {message}", loop
                     )
-                except Exception as e:
-                    printAndDiscord(f"{key} {account}: Error placing order: {e}", loop)
-                    print(traceback.format_exc())
+                    traceback.print_exception(message)
                     continue
+                printAndDiscord(
+                    f"{key}: {orderObj.get_action()} {orderObj.get_amount()} of {s} in {account}: {message}",
+                    loop,
+                )
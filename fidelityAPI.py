@@ -4,22 +4,30 @@
 # 2024/09/19
 # Adapted from Nelson Dane's Selenium based code and created with the help of playwright codegen
 
-import asyncio
 import os
 import traceback
 
 from dotenv import load_dotenv
 from fidelity import fidelity
+from playwright_stealth import stealth_sync
 
 from helperAPI import (
     Brokerage,
-    getOTPCodeDiscord,
+    browser_workers,
+    getOTPCode,
     maskString,
     printAndDiscord,
     printHoldings,
+    run_parallel,
     stockOrder,
 )
 
+ORDER_ENTRY_URL = (
+    "https://digital.fidelity.com/ftgw/digital/trade-equity/index/orderEntry"
+)
+# How many trade tickets to load at once in each logged in browser
+FIDELITY_TABS = int(os.getenv("FIDELITY_TABS", "3"))
+
 
 def fidelity_run(
     orderObj: stockOrder, command=None, botObj=None, loop=None, FIDELITY_EXTERNAL=None
@@ -47,12 +55,10 @@ def fidelity_run(
     # Set the functions to be run
     _, second_command = command
 
-    # For each set of login info, i.e. separate chase accounts
-    for account in accounts:
-        # Start at index 1 and go to how many logins we have
-        index = accounts.index(account) + 1
+    def fidelity_login(index_account):
+        # Log in and run the command for one set of login info
+        index, account = index_account
         name = f"Fidelity {index}"
-        # Receive the chase broker class object and the AllAccount object related to it
         fidelityobj = fidelity_init(
             account=account,
             name=name,
@@ -60,14 +66,27 @@ def fidelity_run(
             botObj=botObj,
             loop=loop,
         )
-        if fidelityobj is not None:
+        if fidelityobj is None:
+            return None
+        if second_command == "_holdings":
+            fidelity_holdings(fidelityobj, name, loop=loop)
+        # Only other option is _transaction
+        else:
+            fidelity_transaction(fidelityobj, name, orderObj, loop=loop)
+        return fidelityobj
+
+    # Each set of login info, i.e. separate households, runs its own browser
+    results = run_parallel(
+        fidelity_login,
+        enumerate(accounts, start=1),
+        max_workers=browser_workers(len(accounts)),
+    )
+    for index, result in enumerate(results, start=1):
+        if isinstance(result, Exception):
+            print(f"Error in Fidelity {index}: {result}")
+        elif result is not None:
             # Store the Brokerage object for fidelity under 'fidelity' in the orderObj
-            orderObj.set_logged_in(fidelityobj, "fidelity")
-            if second_command == "_holdings":
-                fidelity_holdings(fidelityobj, name, loop=loop)
-            # Only other option is _transaction
-            else:
-                fidelity_transaction(fidelityobj, name, orderObj, loop=loop)
+            orderObj.set_logged_in(result, "fidelity")
     return None
 
 
@@ -104,16 +123,11 @@ def fidelity_init(account: str, name: str, headless=True, botObj=None, loop=None
         )
         # If 2FA is present, ask for code
         if step_1 and not step_2:
-            if botObj is None and loop is None:
-                fidelity_browser.login_2FA(input("Enter code: "))
-            else:
-                # Should wait for 60 seconds before timeout
-                sms_code = asyncio.run_coroutine_threadsafe(
-                    getOTPCodeDiscord(botObj, name, code_len=6, loop=loop), loop
-                ).result()
-                if sms_code is None:
-                    raise Exception(f"{name} No SMS code found", loop)
-                fidelity_browser.login_2FA(sms_code)
+            # Should wait for 60 seconds before timeout
+            sms_code = getOTPCode(botObj, name, code_len=6, loop=loop)
+            if sms_code is None:
+                raise Exception(f"{name} No SMS code found", loop)
+            fidelity_browser.login_2FA(sms_code)
         elif not step_1:
             raise Exception(
                 f"{name}: Login Failed. Got Error Page: Current URL: {fidelity_browser.page.url}"
@@ -203,25 +217,35 @@ def fidelity_transaction(
     )
     # Get full list of accounts in case some had no holdings
     fidelity_browser.get_list_of_accounts()
-    # Go trade
     for stock in orderObj.get_stocks():
         # Say what we are doing
         printAndDiscord(
             f"{name}: {orderObj.get_action()}ing {orderObj.get_amount()} of {stock}",
             loop,
         )
-        # Reload the page incase we were trading before
-        fidelity_browser.page.reload()
-        for account_number in fidelity_browser.account_dict:
-            # If we are selling, check to see if the account has the stock to sell
-            if (
-                orderObj.get_action().lower() == "sell"
-                and stock not in fidelity_browser.get_stocks_in_account(account_number)
-            ):
-                # Doesn't have it, skip account
-                continue
-
-            # Go trade for all accounts for that stock
+    orders = [
+        (stock, account_number)
+        for stock in orderObj.get_stocks()
+        for account_number in fidelity_browser.account_dict
+        # If we are selling, check to see if the account has the stock to sell
+        if orderObj.get_action().lower() == "buy"
+        or stock in fidelity_browser.get_stocks_in_account(account_number)
+    ]
+    # Each order needs a freshly loaded ticket, so load the next tickets in other
+    # tabs of the same logged in context while the current one is filled in
+    main_page = fidelity_browser.page
+    tabs = [main_page]
+    try:
+        for _ in range(min(FIDELITY_TABS, len(orders)) - 1):
+            tab = main_page.context.new_page()
+            stealth_sync(tab, fidelity_browser.stealth_config)
+            tabs.append(tab)
+        for tab, _ in zip(tabs, orders):
+            tab.goto(ORDER_ENTRY_URL, wait_until="commit")
+        for i, (stock, account_number) in enumerate(orders):
+            # Go trade for that account and stock on its tab
+            tab = tabs[i % len(tabs)]
+            fidelity_browser.page = tab
             success, error_message = fidelity_browser.transaction(
                 stock,
                 orderObj.get_amount(),
@@ -229,6 +253,12 @@ def fidelity_transaction(
                 account_number,
                 orderObj.get_dry(),
             )
+            # Start loading the ticket this tab is used for next
+            if i + len(tabs) < len(orders):
+                try:
+                    tab.goto(ORDER_ENTRY_URL, wait_until="commit")
+                except Exception as e:
+                    print(f"{name}: Error loading trade page: {e}")
             print_account = maskString(account_number)
             # Report error if occurred
             if not success:
@@ -248,6 +278,12 @@ def fidelity_transaction(
                     f"{name} account {print_account}: {orderObj.get_action()} {orderObj.get_amount()} shares of {stock}",
                     loop,
                 )
-
-    # Close browser
-    fidelity_browser.close_browser()
+    finally:
+        # Always hand back the main page and close the extra tabs and browser
+        fidelity_browser.page = main_page
+        for tab in tabs[1:]:
+            try:
+                tab.close()
+            except Exception as e:
+                print(f"{name}: Error closing trade tab: {e}")
+        fidelity_browser.close_browser()
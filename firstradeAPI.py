@@ -5,7 +5,7 @@ import asyncio
 import os
 import pprint
 import traceback
-from time import sleep
+from time import perf_counter, sleep
 
 from dotenv import load_dotenv
 from firstrade import account as ft_account
@@ -18,10 +18,18 @@ from helperAPI import (
     maskString,
     printAndDiscord,
     printHoldings,
+    quote_cache,
+    run_parallel,
     stockOrder,
 )
 
 
+def firstrade_quote(obj: ft_account.FTSession, account: str, symbol: str) -> dict:
+    # Get quote fields for the shared quote cache
+    quote = symbols.SymbolQuote(obj, account, symbol)
+    return {"last": quote.last, "ask": quote.ask, "bid": quote.bid}
+
+
 def firstrade_init(botObj=None, loop=None):
     # Initialize .env file
     load_dotenv()
@@ -91,17 +99,34 @@ def firstrade_init(botObj=None, loop=None):
 def firstrade_holdings(firstrade_o: Brokerage, loop=None):
     # Get holdings on each account
     for key in firstrade_o.get_account_numbers():
+        obj: ft_account.FTSession = firstrade_o.get_logged_in_objects(key)
+        try:
+            # Account data is the same for every account under this login
+            account_data = ft_account.FTAccountData(obj)
+        except Exception as e:
+            printAndDiscord(f"{key}: Error getting account data: {e}", loop)
+            print(traceback.format_exc())
+            continue
         for account in firstrade_o.get_account_numbers(key):
-            obj: ft_account.FTSession = firstrade_o.get_logged_in_objects(key)
+            start = perf_counter()
             try:
-                data = ft_account.FTAccountData(obj).get_positions(account=account)
-                for item in data["items"]:
-                    symbol = item["symbol"]
+                data = account_data.get_positions(account=account)
+
+                def get_price(symbol):
                     try:
-                        quote = symbols.SymbolQuote(obj, account, symbol)
-                        price = quote.last
+                        return quote_cache.get_quote(
+                            symbol,
+                            "last",
+                            lambda sym: firstrade_quote(obj, account, sym),
+                        )
                     except QuoteRequestError:
-                        price = 0
+                        return 0
+
+                symbols = [item["symbol"] for item in data["items"]]
+                prices = run_parallel(get_price, symbols)
+                for item, symbol, price in zip(data["items"], symbols, prices):
+                    if isinstance(price, Exception):
+                        raise price
                     firstrade_o.set_holdings(
                         key,
                         account,
@@ -113,6 +138,9 @@ def firstrade_holdings(firstrade_o: Brokerage, loop=None):
                 printAndDiscord(f"{key} {account}: Error getting holdings: {e}", loop)
                 print(traceback.format_exc())
                 continue
+            print(
+                f"{key} {maskString(account)}: Holdings fetched in {perf_counter() - start:.2f}s"
+            )
     printHoldings(firstrade_o, loop)
 
 
@@ -137,16 +165,18 @@ def firstrade_transaction(firstrade_o: Brokerage, orderObj: stockOrder, loop=Non
                 original_action = orderObj.get_action()
                 try:
                     should_dance = False
-                    symbol_data = symbols.SymbolQuote(obj, account, s)
-                    if symbol_data.last < 1.00:
+                    last_price = quote_cache.get_quote(
+                        s, "last", lambda sym: firstrade_quote(obj, account, sym)
+                    )
+                    if last_price < 1.00:
                         if int(orderObj.get_amount()) < 100:
                             should_dance = True
                         price_type = order.PriceType.LIMIT
                         orderObj.set_price("limit")
                         if orderObj.get_action().capitalize() == "Buy":
-                            price = symbol_data.last + 0.01
+                            price = last_price + 0.01
                         else:
-                            price = symbol_data.last - 0.01
+                            price = last_price - 0.01
                     else:
                         price_type = order.PriceType.MARKET
                         orderObj.set_price("market")
@@ -199,10 +229,13 @@ def firstrade_transaction(firstrade_o: Brokerage, orderObj: stockOrder, loop=Non
                             )
                             raise Exception(f"Error buying {quantity} of {s}")
                         orderObj.set_amount(quantity - old_amount)
-                        # Rest before selling
+                        # Rest before selling, then re-quote so the sell limit
+                        # uses the price after the buy, not the cached one
                         sleep(1)
-                        symbol_data = symbols.SymbolQuote(obj, account, s)
-                        price = symbol_data.last - 0.01
+                        quote = firstrade_quote(obj, account, s)
+                        quote_cache.set_quote(s, **quote)
+                        last_price = quote["last"]
+                        price = last_price - 0.01
                         ft_order = order.Order(obj)
                         order_conf = ft_order.place_order(
                             account=account,
@@ -3,22 +3,30 @@
 # to share between scripts
 
 import asyncio
+import atexit
+import json
 import os
 import pickle
+import random
+import re
 import subprocess
 import sys
 import textwrap
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from importlib.metadata import version
 from pathlib import Path
 from queue import Queue
-from threading import Thread
-from time import sleep
+from threading import Event, Lock, RLock, Thread
+from time import monotonic, perf_counter, sleep
 
 import requests
 from discord.ext import commands
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.service import Service as ChromiumService
 from selenium_stealth import stealth
 import undetected_chromedriver as uc
@@ -28,6 +36,15 @@ DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 DISCORD_CHANNEL = os.getenv("DISCORD_CHANNEL")
 HEADLESS = os.getenv("HEADLESS", "true").lower() != "false"
 SORT_BROKERS = os.getenv("SORT_BROKERS", "true").lower() != "false"
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "10"))
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "8"))
+HTTP_TIMEOUT = (
+    float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("HTTP_READ_TIMEOUT", "30")),
+)
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "0"))
+BROWSER_MEMORY_MB = int(os.getenv("BROWSER_MEMORY_MB", "600"))
 
 # Create task queue
 task_queue = Queue()
@@ -208,6 +225,7 @@ class Brokerage:
         self.__holdings: dict = {}  # Dictionary of holdings under parent
         self.__account_totals: dict = {}  # Dictionary of account totals
         self.__account_types: dict = {}  # Dictionary of account types
+        self.__loaders: dict = {}  # Dictionary of deferred account data loaders
 
     def set_name(self, name: str):
         if not isinstance(name, str):
@@ -275,6 +293,18 @@ class Brokerage:
             self.__account_types[parent_name] = {}
         self.__account_types[parent_name][account_name] = account_type
 
+    def set_loader(self, parent_name: str, loader):
+        # Defer fetching account totals and holdings until they are first read
+        self.__loaders[parent_name] = loader
+
+    def load(self, parent_name: str = None):
+        # Run any deferred loaders
+        names = list(self.__loaders) if parent_name is None else [parent_name]
+        for name in names:
+            loader = self.__loaders.pop(name, None)
+            if loader is not None:
+                loader()
+
     def get_name(self) -> str:
         return self.__name
 
@@ -293,6 +323,7 @@ class Brokerage:
         return self.__logged_in_objects.get(parent_name, {}).get(account_name, {})
 
     def get_holdings(self, parent_name: str = None, account_name: str = None) -> dict:
+        self.load(parent_name)
         if parent_name is None:
             return self.__holdings
         if account_name is None:
@@ -302,6 +333,7 @@ class Brokerage:
     def get_account_totals(
         self, parent_name: str = None, account_name: str = None
     ) -> dict:
+        self.load(parent_name)
         if parent_name is None:
             return self.__account_totals
         if account_name is None:
@@ -353,6 +385,343 @@ class ThreadHandler:
         return self.queue.get()
 
 
+def run_parallel(func, items, max_workers: int = MAX_WORKERS) -> list:
+    # Run func for each item on a bounded thread pool
+    # Results keep the order of items, failed items return their exception
+    items = list(items)
+    results = [None] * len(items)
+    if len(items) == 0:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as pool:
+        futures = {pool.submit(func, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = e
+    return results
+
+
+def available_memory_mb() -> int | None:
+    # Memory that can be used without swapping, None if it can't be read
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2**20
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def browser_workers(count: int) -> int:
+    # How many logins can each run a browser at once without running out of memory
+    workers = min(count, MAX_WORKERS)
+    memory = available_memory_mb()
+    if memory is not None:
+        workers = min(workers, memory // BROWSER_MEMORY_MB)
+    return max(1, workers)
+
+
+class AsyncLoopThread:
+    def __init__(self, name: str):
+        self.__name: str = name  # Name of the background thread
+        self.__loop: asyncio.AbstractEventLoop = None
+        self.__thread: Thread = None
+        self.__lock = Lock()
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        # Start the loop on first use and keep it for the life of the program
+        with self.__lock:
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__loop = asyncio.new_event_loop()
+                self.__thread = Thread(
+                    target=self.__loop.run_forever, name=self.__name, daemon=True
+                )
+                self.__thread.start()
+            return self.__loop
+
+    def submit(self, coro):
+        # Schedule a coroutine and return a concurrent.futures.Future
+        return asyncio.run_coroutine_threadsafe(coro, self.get_loop())
+
+    def run(self, coro, timeout=None):
+        # Run a coroutine on the loop and wait for its result
+        return self.submit(coro).result(timeout)
+
+
+class QuoteCache:
+    def __init__(self, ttl: float = QUOTE_CACHE_TTL):
+        self.__ttl: float = ttl  # Seconds before a quote is considered stale
+        self.__quotes: dict = {}  # Dictionary of symbol to quote fields
+        self.__pending: dict = {}  # Dictionary of symbol to in-flight lookup events
+        self.__lock = Lock()
+        self.__hits: int = 0  # Lookups answered from the cache
+        self.__fetches: int = 0  # Lookups that went to a broker
+
+    def __is_fresh(self, quote: dict) -> bool:
+        return quote is not None and monotonic() - quote["time"] < self.__ttl
+
+    def set_quote(self, symbol: str, **fields):
+        # Store quote fields (last, ask, bid, ...) from any broker
+        symbol = symbol.upper()
+        fields = {k: float(v) for k, v in fields.items() if v is not None}
+        if not fields:
+            return
+        with self.__lock:
+            quote = self.__quotes.get(symbol)
+            if not self.__is_fresh(quote):
+                quote = {}
+            quote.update(fields)
+            quote["time"] = monotonic()
+            self.__quotes[symbol] = quote
+
+    def get_quote(self, symbol: str, field: str = "last", fetcher=None):
+        # Return a cached quote field, or fetch it once for all waiting callers
+        # fetcher(symbol) should return a dict of quote fields
+        symbol = symbol.upper()
+        while True:
+            with self.__lock:
+                quote = self.__quotes.get(symbol)
+                if self.__is_fresh(quote) and field in quote:
+                    self.__hits += 1
+                    return quote[field]
+                if fetcher is None:
+                    return None
+                event = self.__pending.get(symbol)
+                is_owner = event is None
+                if is_owner:
+                    event = Event()
+                    self.__pending[symbol] = event
+            if is_owner:
+                break
+            # Another thread is already fetching this symbol
+            event.wait()
+        try:
+            with self.__lock:
+                self.__fetches += 1
+            fields = fetcher(symbol) or {}
+            self.set_quote(symbol, **fields)
+        finally:
+            with self.__lock:
+                self.__pending.pop(symbol, None)
+            event.set()
+        value = fields.get(field)
+        return float(value) if value is not None else None
+
+    def clear(self):
+        with self.__lock:
+            self.__quotes = {}
+            self.__hits = 0
+            self.__fetches = 0
+
+    def get_stats(self) -> dict:
+        with self.__lock:
+            return {"hits": self.__hits, "fetches": self.__fetches}
+
+
+# Shared quote cache for all brokers
+quote_cache = QuoteCache()
+
+
+class TimingReport:
+    def __init__(self):
+        self.__endpoints: dict = {}  # Dictionary of endpoint to latency and statuses
+        self.__lock = Lock()
+
+    def record(self, endpoint: str, elapsed: float, status="error"):
+        with self.__lock:
+            if endpoint not in self.__endpoints:
+                self.__endpoints[endpoint] = {
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "statuses": {},
+                }
+            stats = self.__endpoints[endpoint]
+            stats["count"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+            stats["statuses"][str(status)] = stats["statuses"].get(str(status), 0) + 1
+
+    def clear(self):
+        with self.__lock:
+            self.__endpoints = {}
+
+    def get_endpoints(self) -> dict:
+        with self.__lock:
+            return dict(self.__endpoints)
+
+    def __str__(self) -> str:
+        lines = ["Timing Report:"]
+        for endpoint, stats in sorted(self.get_endpoints().items()):
+            average = stats["total"] / stats["count"]
+            statuses = ", ".join(f"{k}: {v}" for k, v in stats["statuses"].items())
+            lines.append(
+                f"  {endpoint}: {stats['count']} calls, avg {average:.3f}s, max {stats['max']:.3f}s ({statuses})"
+            )
+        if len(lines) == 1:
+            lines.append("  No requests recorded")
+        return "\n".join(lines)
+
+
+# Timing report for the current run
+timing_report = TimingReport()
+
+
+class DiscardCookieJar(RequestsCookieJar):
+    # Cookie jar that never stores response cookies
+    def set_cookie(self, cookie, *args, **kwargs):
+        return
+
+
+class HTTPClient:
+    IDEMPOTENT_METHODS = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+    RETRY_STATUSES = [500, 502, 503, 504]
+    # Path segments that are IDs: all digits or a UUID
+    ID_PATTERN = re.compile(
+        r"\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    )
+
+    def __init__(self, host: str, impersonate: str = None):
+        self.__host: str = host  # Host this client talks to
+        self.__timeout: tuple = HTTP_TIMEOUT  # Default (connect, read) timeout
+        self.__retries: int = HTTP_RETRIES  # Attempts for idempotent requests
+        # Sessions are shared between accounts, so credentials are passed with
+        # each request and cookies from responses are never kept
+        if impersonate is None:
+            self.__session = requests.Session()
+            self.__session.cookies = DiscardCookieJar()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+            self.__session.mount("https://", adapter)
+            self.__session.mount("http://", adapter)
+        else:
+            # Some brokers block clients that don't look like a browser
+            from curl_cffi import requests as curl_requests
+
+            self.__session = curl_requests.Session(
+                impersonate=impersonate, cookies=DiscardCookieJar()
+            )
+
+    def get_host(self) -> str:
+        return self.__host
+
+    def get_session(self):
+        return self.__session
+
+    def endpoint_name(self, method: str, url: str) -> str:
+        # Hide account numbers and IDs so similar calls group together
+        path = url.split("://", 1)[-1].split("?", 1)[0].split("/", 1)
+        path = path[1] if len(path) > 1 else ""
+        path = "/".join(
+            "{id}" if self.ID_PATTERN.fullmatch(part) else part
+            for part in path.split("/")
+        )
+        return f"{method} {self.__host}/{path}"
+
+    def request(self, method: str, url: str, **kwargs):
+        method = method.upper()
+        kwargs.setdefault("timeout", self.__timeout)
+        endpoint = self.endpoint_name(method, url)
+        attempts = self.__retries if method in self.IDEMPOTENT_METHODS else 1
+        for attempt in range(1, attempts + 1):
+            start = perf_counter()
+            try:
+                response = self.__session.request(method, url, **kwargs)
+            except Exception as e:
+                timing_report.record(endpoint, perf_counter() - start)
+                if attempt >= attempts:
+                    raise
+                print(f"{endpoint} failed ({e}), retrying...")
+            else:
+                timing_report.record(
+                    endpoint, perf_counter() - start, response.status_code
+                )
+                if (
+                    response.status_code not in self.RETRY_STATUSES
+                    or attempt >= attempts
+                ):
+                    return response
+            # Jittered exponential backoff
+            sleep(0.5 * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+http_clients: dict = {}
+http_clients_lock = Lock()
+
+
+def get_http_client(host: str, impersonate: str = None) -> HTTPClient:
+    # Get the pooled client for a host, creating it on first use
+    with http_clients_lock:
+        key = (host, impersonate)
+        if key not in http_clients:
+            http_clients[key] = HTTPClient(host, impersonate=impersonate)
+        return http_clients[key]
+
+
+# Dictionary of broker to (url, session) pairs to warm before orders
+prewarm_targets: dict = {}
+
+
+def register_prewarm(broker: str, url: str, session=None):
+    # Session defaults to the pooled client for the url's host
+    if broker not in prewarm_targets:
+        prewarm_targets[broker] = []
+    prewarm_targets[broker].append((url, session))
+
+
+def prewarm_connection(url: str, session=None, measure=False):
+    # Open a keep-alive connection so the next request skips DNS and TLS setup
+    # When measuring, a second request on the open connection shows how much
+    # connection setup was removed, which goes in the timing report
+    host = url.split("://", 1)[-1].split("/", 1)[0]
+    if session is None:
+        session = get_http_client(host).get_session()
+    try:
+        start = perf_counter()
+        session.head(url, timeout=HTTP_TIMEOUT)
+        cold = perf_counter() - start
+        if measure:
+            start = perf_counter()
+            session.head(url, timeout=HTTP_TIMEOUT)
+            warm = perf_counter() - start
+            timing_report.record(
+                f"pre-warm {host} setup removed", max(cold - warm, 0), "saved"
+            )
+    except Exception as e:
+        print(f"Error pre-warming connection to {url}: {e}")
+
+
+def prewarm_broker(broker: str, measure=False) -> Thread:
+    # Warm all of a broker's order hosts in the background
+    targets = prewarm_targets.get(broker, [])
+    thread = Thread(
+        target=run_parallel,
+        args=(lambda target: prewarm_connection(*target, measure=measure), targets),
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+register_prewarm("discord", "https://discord.com/api/v10/gateway")
+
+
 def is_up_to_date(remote, branch):
     # Assume succeeded in updater()
     import git
@@ -537,7 +906,30 @@ def check_if_page_loaded(driver):
     return readystate == "complete"
 
 
-def getDriver(DOCKER=False):
+def wait_for_any(driver, outcomes: dict, poll=0.1):
+    # Race several expected page states and return (name, result) of the first seen
+    # outcomes maps a name to (condition, timeout in seconds), where condition is
+    # an expected condition or any function of the driver
+    # Each outcome stops being checked after its own timeout, (None, None) if all do
+    start = monotonic()
+    pending = dict(outcomes)
+    while pending:
+        elapsed = monotonic() - start
+        for name, (condition, timeout) in list(pending.items()):
+            try:
+                result = condition(driver)
+                if result:
+                    return name, result
+            except WebDriverException:
+                pass
+            if elapsed >= timeout:
+                del pending[name]
+        if pending:
+            sleep(poll)
+    return None, None
+
+
+def newDriver(DOCKER=False):
     # Init webdriver options
     try:
         options = webdriver.ChromeOptions()
@@ -571,7 +963,7 @@ def getDriver(DOCKER=False):
     return driver
 
 
-def getDriverUndetected(DOCKER=False):
+def newDriverUndetected(DOCKER=False):
     # Init undetected webdriver - better for avoiding bot detection
     try:
         options = uc.ChromeOptions()
@@ -585,26 +977,180 @@ def getDriverUndetected(DOCKER=False):
             options.add_argument("--disable-gpu")
         if DOCKER or HEADLESS:
             options.add_argument("--headless=new")
-        
+
         # Create driver - let undetected-chromedriver handle everything automatically
         driver = uc.Chrome(options=options)
     except Exception as e:
         print(f"Error getting Undetected Driver: {e}")
         print("Falling back to regular Selenium driver...")
-        return getDriver(DOCKER)
+        return newDriver(DOCKER)
     return driver
 
 
+class BrowserPool:
+    def __init__(self, size: int):
+        self.__size: int = size  # Number of drivers to keep open
+        self.__idle: dict = {}  # Returned drivers by kind and profile
+        self.__spares: dict = {}  # Unused pre-launched drivers by kind
+        self.__owners: dict = {}  # Kind and profile of each handed out driver
+        self.__use_spares: bool = False  # Launch drivers ahead of logins
+        self.__lock = Lock()
+
+    def get_size(self) -> int:
+        return self.__size
+
+    def enable_spares(self):
+        # Only worth it for long running bots, one-shot runs would just
+        # start browsers that are closed again on exit
+        self.__use_spares = True
+
+    def __launch(self, kind):
+        undetected, DOCKER = kind
+        if undetected:
+            return newDriverUndetected(DOCKER)
+        return newDriver(DOCKER)
+
+    def __count(self) -> int:
+        # Open drivers that aren't handed out, spares include ones still launching
+        return len(self.__idle) + sum(len(d) for d in self.__spares.values())
+
+    def __refill(self, kind):
+        # Launch spare drivers in the background so the next login doesn't wait
+        if not self.__use_spares:
+            return
+        with self.__lock:
+            # Handed out drivers come back to the pool, so leave room for them
+            missing = self.__size - len(self.__owners) - self.__count()
+            spares = self.__spares.setdefault(kind, [])
+            # Placeholders keep concurrent refills from overfilling the pool
+            spares.extend([None] * max(0, missing))
+
+        def launch():
+            driver = self.__launch(kind)
+            with self.__lock:
+                spares.remove(None)
+                if driver is not None:
+                    spares.append(driver)
+
+        for _ in range(max(0, missing)):
+            Thread(target=launch, daemon=True).start()
+
+    def acquire(self, profile: str = None, DOCKER=False, undetected=False):
+        # Get a driver for a credential, reusing its last driver if still open
+        kind = (undetected, DOCKER)
+        if self.__size <= 0 or profile is None:
+            return self.__launch(kind)
+        driver = None
+        with self.__lock:
+            driver = self.__idle.pop((kind, profile), None)
+            if driver is None:
+                spares = self.__spares.get(kind, [])
+                ready = [d for d in spares if d is not None]
+                if ready:
+                    driver = ready[0]
+                    spares.remove(driver)
+        if driver is not None and not driver_alive(driver):
+            quit_driver(driver)
+            driver = None
+        if driver is None:
+            driver = self.__launch(kind)
+        if driver is not None:
+            with self.__lock:
+                self.__owners[id(driver)] = (kind, profile)
+        self.__refill(kind)
+        return driver
+
+    def release(self, driver):
+        # Keep the driver, cookies and all, for the same credential next time
+        with self.__lock:
+            owner = self.__owners.pop(id(driver), None)
+            if owner is None and driver in self.__idle.values():
+                # Already returned
+                return
+        if owner is None or not driver_alive(driver):
+            quit_driver(driver)
+            return
+        closing = []
+        with self.__lock:
+            old = self.__idle.pop(owner, None)
+            if old is not None:
+                closing.append(old)
+            # Logged in drivers are worth more than spares, so make room
+            for spares in self.__spares.values():
+                for spare in [d for d in spares if d is not None]:
+                    if self.__count() < self.__size:
+                        break
+                    spares.remove(spare)
+                    closing.append(spare)
+            if self.__count() < self.__size:
+                self.__idle[owner] = driver
+            else:
+                closing.append(driver)
+        for driver in closing:
+            quit_driver(driver)
+
+    def discard(self, driver):
+        # Close a driver that failed instead of keeping it for next time
+        with self.__lock:
+            self.__owners.pop(id(driver), None)
+        quit_driver(driver)
+
+    def close(self):
+        with self.__lock:
+            drivers = list(self.__idle.values())
+            for spares in self.__spares.values():
+                drivers.extend(d for d in spares if d is not None)
+            self.__idle = {}
+            self.__spares = {}
+        for driver in drivers:
+            quit_driver(driver)
+
+
+def driver_alive(driver) -> bool:
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def quit_driver(driver):
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"Error closing driver: {e}")
+
+
+browser_pool = BrowserPool(BROWSER_POOL_SIZE)
+atexit.register(browser_pool.close)
+
+
+def getDriver(DOCKER=False, profile=None):
+    # profile names the credential so it gets back its own pooled driver
+    return browser_pool.acquire(profile, DOCKER)
+
+
+def getDriverUndetected(DOCKER=False, profile=None):
+    return browser_pool.acquire(profile, DOCKER, undetected=True)
+
+
+def discardDriver(driver):
+    # Close a driver from getDriver after an error, without returning it to the pool
+    browser_pool.discard(driver)
+
+
 def killSeleniumDriver(brokerObj: Brokerage):
-    # Kill all selenium drivers
+    # Return all selenium drivers to the pool, or close them if not pooled
     count = 0
     if brokerObj is not None:
         for key in brokerObj.get_account_numbers():
             print(f"Killing driver for {key}")
             driver: webdriver = brokerObj.get_logged_in_objects(key)
-            if driver is not None:
-                driver.close()
-                driver.quit()
+            # Accounts that failed to log in have no driver
+            if driver:
+                browser_pool.release(driver)
                 count += 1
         if count > 0:
             print(f"Killed {count} {brokerObj.get_name()} drivers")
@@ -664,7 +1210,9 @@ async def processTasks(message, embed=False):
         success = False
         while success is False:
             try:
-                response = requests.post(BASE_URL, headers=HEADERS, json=PAYLOAD)
+                response = get_http_client("discord.com").post(
+                    BASE_URL, headers=HEADERS, json=PAYLOAD
+                )
                 # Process response
                 if response.status_code == 200:
                     success = True
@@ -737,6 +1285,24 @@ async def getOTPCodeDiscord(
         return code.content
 
 
+# Only one login can ask the user for a code at a time, so that every
+# answer goes to the login that asked for it
+prompt_lock = RLock()
+
+
+def getOTPCode(botObj, name, code_len=6, timeout=60, loop=None):
+    # Ask for an OTP code from a worker thread, over Discord or the terminal
+    with prompt_lock:
+        if botObj is None and loop is None:
+            return input(f"{name}: Enter code: ")
+        return asyncio.run_coroutine_threadsafe(
+            getOTPCodeDiscord(
+                botObj, name, code_len=code_len, timeout=timeout, loop=loop
+            ),
+            loop,
+        ).result()
+
+
 async def getUserInputDiscord(botObj: commands.Bot, prompt, timeout=60, loop=None):
     printAndDiscord(prompt, loop)
     printAndDiscord(
@@ -766,7 +1332,9 @@ async def send_captcha_to_discord(file):
     files = {"file": ("captcha.png", file, "image/png")}
     success = False
     while not success:
-        response = requests.post(BASE_URL, headers=HEADERS, files=files)
+        response = get_http_client("discord.com").post(
+            BASE_URL, headers=HEADERS, files=files
+        )
         if response.status_code == 200:
             success = True
         elif response.status_code == 429:
@@ -867,6 +1435,29 @@ def load_cookies(driver, filename, path=None):
         return False
 
 
+def load_json_cache(filename, path="./creds/") -> dict:
+    # Load a JSON cache file that persists across runs
+    filename = os.path.join(path, filename)
+    if not os.path.exists(filename):
+        return {}
+    try:
+        with open(filename, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading cache {filename}: {e}")
+        return {}
+
+
+def save_json_cache(data: dict, filename, path="./creds/"):
+    if not os.path.exists(path):
+        os.makedirs(path)
+    try:
+        with open(os.path.join(path, filename), "w") as f:
+            json.dump(data, f, indent=2)
+    except Exception as e:
+        print(f"Error saving cache {filename}: {e}")
+
+
 def clear_cookies(driver, important_cookies=None):
     cookies = driver.get_cookies()
     for cookie in cookies:
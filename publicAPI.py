@@ -1,6 +1,7 @@
 import asyncio
 import os
 import traceback
+from time import perf_counter
 
 from dotenv import load_dotenv
 from public_invest_api import Public
@@ -11,11 +12,13 @@ from helperAPI import (
     maskString,
     printAndDiscord,
     printHoldings,
+    quote_cache,
+    run_parallel,
     stockOrder,
 )
 
 
-def public_init(PUBLIC_EXTERNAL=None, botObj=None, loop=None):
+def public_init(PUBLIC_EXTERNAL=None, botObj=None, loop=None, mode="holdings"):
     # Initialize .env file
     load_dotenv()
     # Import Public account
@@ -75,8 +78,16 @@ def public_init(PUBLIC_EXTERNAL=None, botObj=None, loop=None):
             print(f"{name}: Found account {maskString(an)}")
             atype = pb.get_account_type()
             public_obj.set_account_type(name, an, atype)
-            cash = pb.get_account_cash()
-            public_obj.set_account_totals(name, an, cash)
+            public_obj.set_account_totals(name, an, 0)
+
+            # Cash isn't needed to place orders, so wait until it is read
+            def load_cash(name=name, pb=pb, an=an):
+                public_obj.set_account_totals(name, an, pb.get_account_cash())
+
+            if mode == "transaction":
+                public_obj.set_loader(name, load_cash)
+            else:
+                load_cash()
         except Exception as e:
             print(f"Error logging in to Public: {e}")
             print(traceback.format_exc())
@@ -89,23 +100,36 @@ def public_holdings(pbo: Brokerage, loop=None):
     for key in pbo.get_account_numbers():
         for account in pbo.get_account_numbers(key):
             obj: Public = pbo.get_logged_in_objects(key)
+            start = perf_counter()
             try:
                 # Get account holdings
                 positions = obj.get_positions()
                 if positions != []:
-                    for holding in positions:
-                        # Get symbol, quantity, and total value
-                        sym = holding["instrument"]["symbol"]
+
+                    def get_price(sym):
+                        return quote_cache.get_quote(
+                            sym,
+                            "last",
+                            lambda s: {"last": obj.get_symbol_price(s)},
+                        )
+
+                    # Get symbol, quantity, and price of each holding at once
+                    symbols = [holding["instrument"]["symbol"] for holding in positions]
+                    prices = run_parallel(get_price, symbols)
+                    for holding, sym, current_price in zip(positions, symbols, prices):
                         qty = float(holding["quantity"])
-                        try:
-                            current_price = obj.get_symbol_price(sym)
-                        except Exception:
+                        if isinstance(current_price, Exception):
+                            current_price = None
+                        if current_price is None:
                             current_price = "N/A"
                         pbo.set_holdings(key, account, sym, qty, current_price)
             except Exception as e:
                 printAndDiscord(f"{key}: Error getting account holdings: {e}", loop)
                 traceback.format_exc()
                 continue
+            print(
+                f"{key} {maskString(account)}: Holdings fetched in {perf_counter() - start:.2f}s"
+            )
     printHoldings(pbo, loop)
 
 
@@ -7,7 +7,34 @@ import traceback
 import robin_stocks.robinhood as rh
 from dotenv import load_dotenv
 
-from helperAPI import Brokerage, maskString, printAndDiscord, printHoldings, stockOrder
+from helperAPI import (
+    Brokerage,
+    load_json_cache,
+    maskString,
+    printAndDiscord,
+    printHoldings,
+    quote_cache,
+    register_prewarm,
+    save_json_cache,
+    stockOrder,
+)
+
+# robin_stocks sends every request through its own shared session
+register_prewarm(
+    "robinhood", "https://api.robinhood.com/", getattr(rh.globals, "SESSION", None)
+)
+
+
+def robinhood_quote(symbol: str) -> dict:
+    # Get quote fields for the shared quote cache
+    quotes = rh.get_quotes(symbol)
+    if not quotes or quotes[0] is None:
+        return {}
+    return {
+        "ask": quotes[0].get("ask_price"),
+        "bid": quotes[0].get("bid_price"),
+        "last": quotes[0].get("last_trade_price"),
+    }
 
 
 def login_with_cache(pickle_path, pickle_name, username=None, password=None):
@@ -96,68 +123,99 @@ def robinhood_init(ROBINHOOD_EXTERNAL=None, botObj=None, loop=None):
     return rh_obj
 
 
+def robinhood_instrument_symbol(obj: rh, instrument_url: str, instruments: dict):
+    # Instrument IDs never change symbol, so they are cached on disk
+    instrument_id = instrument_url.split("/")[-2]  # Get ID from URL
+    if instrument_id not in instruments:
+        instrument_data = obj.get_instrument_by_url(
+            f"https://api.robinhood.com/instruments/{instrument_id}/"
+        )
+        if not instrument_data or not instrument_data.get("symbol"):
+            return None
+        instruments[instrument_id] = instrument_data["symbol"]
+    return instruments[instrument_id]
+
+
 def robinhood_holdings(rho: Brokerage, loop=None):
+    # Get credentials from environment
+    RH = os.environ["ROBINHOOD"].strip().split(",") if os.getenv("ROBINHOOD") else []
+    instruments = load_json_cache("robinhood_instruments.json")
     for key in rho.get_account_numbers():
+        obj: rh = rho.get_logged_in_objects(key)
+        index = int(key.split()[-1]) - 1
+        creds = RH[index].split(":") if index < len(RH) else None
+        # Validate login once per credential
+        try:
+            login_with_cache(
+                pickle_path="./creds/",
+                pickle_name=key,
+                username=creds[0] if creds else None,
+                password=creds[1] if creds else None,
+            )
+        except Exception as e:
+            printAndDiscord(f"{key}: Error logging in: {e}", loop)
+            print(traceback.format_exc())
+            continue
         for account in rho.get_account_numbers(key):
-            obj: rh = rho.get_logged_in_objects(key)
-            # Get credentials from environment
-            RH = os.environ["ROBINHOOD"].strip().split(",")
-            creds = None
-            for rh_account in RH:
-                if key.split()[-1] == str(RH.index(rh_account) + 1):
-                    creds = rh_account.split(":")
-                    break
-            
             try:
-                login_with_cache(
-                    pickle_path="./creds/",
-                    pickle_name=key,
-                    username=creds[0] if creds else None,
-                    password=creds[1] if creds else None
-                )
-                
                 # Get account holdings
                 positions = obj.get_open_stock_positions(account_number=account)
-                if positions != []:
-                    for item in positions:
+                account_positions = []
+                for item in positions:
+                    # First try to get symbol from the position data
+                    sym = item.get("symbol")
+                    if not sym:
                         try:
-                            # First try to get symbol from the position data
-                            sym = item.get("symbol")
-                            if not sym:
-                                try:
-                                    # If symbol not in position data, try to get it from instrument URL
-                                    instrument_id = item["instrument"].split("/")[-2]  # Get ID from URL
-                                    instrument_data = obj.get_instrument_by_url(f"https://api.robinhood.com/instruments/{instrument_id}/")
-                                    sym = instrument_data.get("symbol")
-                                except Exception as e:
-                                    print(f"Error getting symbol from instrument {item.get('instrument')}: {e}")
-                                    continue
-
-                            if not sym:
-                                print(f"Could not determine symbol for holding: {item}")
-                                continue
-
-                            qty = float(item["quantity"])
-                            try:
-                                quote = obj.stocks.get_latest_price(sym)
-                                if quote and quote[0]:
-                                    current_price = round(float(quote[0]), 2)
-                                else:
-                                    print(f"No price data available for {sym}")
-                                    current_price = 0.00
-                            except Exception as e:
-                                print(f"Error getting price for {sym}: {e}")
-                                current_price = 0.00
-                            
-                            if sym and qty >= 0:  # Only add valid holdings
-                                rho.set_holdings(key, account, sym, qty, current_price)
+                            # If symbol not in position data, try to get it from instrument URL
+                            sym = robinhood_instrument_symbol(
+                                obj, item["instrument"], instruments
+                            )
                         except Exception as e:
-                            print(f"Error processing holding: {e}")
+                            print(
+                                f"Error getting symbol from instrument {item.get('instrument')}: {e}"
+                            )
                             continue
+                    if not sym:
+                        print(f"Could not determine symbol for holding: {item}")
+                        continue
+                    account_positions.append((sym, float(item["quantity"])))
+                if account_positions == []:
+                    continue
+                # Get all prices in one request
+                symbols = list(dict.fromkeys(sym for sym, _ in account_positions))
+                latest_prices = {}
+                try:
+                    # Unknown symbols are dropped, so match quotes by their symbol
+                    for quote in obj.stocks.get_quotes(symbols) or []:
+                        if quote is not None and quote.get("symbol"):
+                            latest_prices[quote["symbol"].upper()] = quote.get(
+                                "last_extended_hours_trade_price"
+                            ) or quote.get("last_trade_price")
+                except Exception as e:
+                    print(f"Error getting prices for {symbols}: {e}")
+                for sym in symbols:
+                    if latest_prices.get(sym.upper()) is None:
+                        try:
+                            latest_prices[sym.upper()] = obj.stocks.get_latest_price(
+                                sym
+                            )[0]
+                        except Exception as e:
+                            print(f"Error getting price for {sym}: {e}")
+                for sym, qty in account_positions:
+                    price = latest_prices.get(sym.upper())
+                    if price:
+                        current_price = round(float(price), 2)
+                        quote_cache.set_quote(sym, last=price)
+                    else:
+                        print(f"No price data available for {sym}")
+                        current_price = 0.00
+                    if qty >= 0:  # Only add valid holdings
+                        rho.set_holdings(key, account, sym, qty, current_price)
             except Exception as e:
                 printAndDiscord(f"{key}: Error getting account holdings: {e}", loop)
                 print(traceback.format_exc())
                 continue
+    save_json_cache(instruments, "robinhood_instruments.json")
     printHoldings(rho, loop)
 
 
@@ -173,9 +231,10 @@ def robinhood_transaction(rho: Brokerage, orderObj: stockOrder, loop=None):
                 f"{key}: {orderObj.get_action()}ing {orderObj.get_amount()} of {s}",
                 loop,
             )
+            # Robinhood uses one global session, so switch once per credential
+            login_with_cache(pickle_path="./creds/", pickle_name=key)
             for account in rho.get_account_numbers(key):
                 obj: rh = rho.get_logged_in_objects(key)
-                login_with_cache(pickle_path="./creds/", pickle_name=key)
                 print_account = maskString(account)
                 if not orderObj.get_dry():
                     try:
@@ -193,8 +252,8 @@ def robinhood_transaction(rho: Brokerage, orderObj: stockOrder, loop=None):
                                 f"{key}: Error {orderObj.get_action()}ing {orderObj.get_amount()} of {s} in {print_account}, trying Limit Order",
                                 loop,
                             )
-                            ask = obj.get_latest_price(s, priceType="ask_price")[0]
-                            bid = obj.get_latest_price(s, priceType="bid_price")[0]
+                            ask = quote_cache.get_quote(s, "ask", robinhood_quote)
+                            bid = quote_cache.get_quote(s, "bid", robinhood_quote)
                             if ask is not None and bid is not None:
                                 print(f"Ask: {ask}, Bid: {bid}")
                                 # Add or subtract 1 cent to ask or bid
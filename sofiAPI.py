@@ -2,30 +2,39 @@ import asyncio
 import datetime
 import os
 import traceback
+from threading import Thread
 from time import sleep
 
 import nodriver as uc
 import pyotp
-from curl_cffi import requests
 from dotenv import load_dotenv
 
 from helperAPI import (
+    AsyncLoopThread,
     Brokerage,
-    getOTPCodeDiscord,
+    HTTPClient,
+    browser_workers,
+    getOTPCode,
+    get_http_client,
     maskString,
+    prewarm_connection,
     printAndDiscord,
     printHoldings,
+    quote_cache,
+    register_prewarm,
+    run_parallel,
     stockOrder,
 )
 
 load_dotenv()
 
 COOKIES_PATH = "creds"
-# Get or create the event loop
-try:
-    sofi_loop = asyncio.get_event_loop()
-except RuntimeError:
-    sofi_loop = asyncio.new_event_loop()
+# SoFi blocks clients that don't look like Chrome
+# Shared client for quotes, logins each get their own so cookies never mix
+sofi_http = get_http_client("www.sofi.com", impersonate="chrome")
+register_prewarm("sofi", "https://www.sofi.com/", sofi_http.get_session())
+# All SoFi browsers are driven from one background event loop
+sofi_loop = AsyncLoopThread("sofi")
 
 
 def create_creds_folder():
@@ -86,6 +95,11 @@ async def sofi_error(error: str, page=None, discord_loop=None):
         print(f"Failed to log error: {e}")
 
 
+async def wait_for_events(page):
+    # Let the tab process its pending events
+    await page
+
+
 async def get_current_url(page, discord_loop):
     """Get the current page URL by evaluating JavaScript."""
     await page.sleep(1)
@@ -110,7 +124,6 @@ def sofi_run(
     discord_loop = (
         loop  # Keep the parameter as "loop" for consistency with other init functions
     )
-    browser = None
 
     if not os.getenv("SOFI") and SOFI_EXTERNAL is None:
         return None
@@ -128,64 +141,81 @@ def sofi_run(
     # Set the functions to be run
     _, second_command = command
 
-    cookie_filename = None
-    try:
-        for account in accounts:
-            index = accounts.index(account) + 1
-            name = f"SoFi {index}"
-            cookie_filename = f"{COOKIES_PATH}/{name}.pkl"
+    def sofi_login(index_account):
+        # Log in and run the command for one set of login info in its own browser
+        index, account = index_account
+        name = f"SoFi {index}"
+        cookie_filename = f"{COOKIES_PATH}/{name}.pkl"
+        browser = None
+        # Own session per login, warmed while the browser logs in
+        http = HTTPClient("www.sofi.com", impersonate="chrome")
+        Thread(
+            target=prewarm_connection,
+            args=("https://www.sofi.com/", http.get_session(), True),
+            daemon=True,
+        ).start()
+        try:
             browser_args = [
                 "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
                 "--disable-gpu",
                 "--no-sandbox",
                 "--disable-dev-shm-usage",
                 "--disable-setuid-sandbox",
-                "--window-size=1920,1080"
+                "--window-size=1920,1080",
             ]
             if headless:
                 browser_args.append("--headless=new")
             # Use Brave browser instead of Chrome
-            browser = sofi_loop.run_until_complete(uc.start(
-                browser_args=browser_args,
-                browser_executable_path="C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe"
-            ))
+            browser = sofi_loop.run(
+                uc.start(
+                    browser_args=browser_args,
+                    browser_executable_path="C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
+                )
+            )
             # Give browser time to initialize
-            sofi_loop.run_until_complete(browser.sleep(3))
+            sofi_loop.run(browser.sleep(3))
             print(f"Logging into {name}...")
             login_result = sofi_init(
                 account, name, cookie_filename, botObj, browser, discord_loop, sofi_obj
             )
-            sofi_loop.run_until_complete(browser.sleep(5))
-            if login_result:
-                print(f"Logged in to {name}!")
-                # Set logged-in status in the order object, not the brokerage object
-                orderObj.set_logged_in(sofi_obj, "sofi")
-                if second_command == "_holdings":
-                    sofi_holdings(browser, name, sofi_obj, discord_loop)
-                else:
-                    sofi_transaction(browser, orderObj, discord_loop)
-            else:
+            sofi_loop.run(browser.sleep(5))
+            if not login_result:
                 print(f"Failed to log in to {name}")
-    except Exception as e:
-        sofi_loop.run_until_complete(
-            sofi_error(
-                f"Error during SoFi init process: {e}", discord_loop=discord_loop
-            )
-        )
-        return None
-    finally:
-        if browser:
-            try:
-                sofi_loop.run_until_complete(
-                    save_cookies_to_pkl(browser, cookie_filename)
+                return False
+            print(f"Logged in to {name}!")
+            if second_command == "_holdings":
+                sofi_holdings(browser, http, name, sofi_obj, discord_loop)
+            else:
+                sofi_transaction(browser, http, orderObj, discord_loop)
+            return True
+        except Exception as e:
+            sofi_loop.run(
+                sofi_error(
+                    f"Error during SoFi init process: {e}", discord_loop=discord_loop
                 )
-                browser.stop()
-            except Exception as e:
-                sofi_loop.run_until_complete(
-                    sofi_error(
-                        f"Error closing the browser: {e}", discord_loop=discord_loop
+            )
+            return False
+        finally:
+            if browser:
+                try:
+                    sofi_loop.run(save_cookies_to_pkl(browser, cookie_filename))
+                    # Stopping schedules work on the loop, so call it from there
+                    sofi_loop.get_loop().call_soon_threadsafe(browser.stop)
+                except Exception as e:
+                    sofi_loop.run(
+                        sofi_error(
+                            f"Error closing the browser: {e}", discord_loop=discord_loop
+                        )
                     )
-                )
+
+    results = run_parallel(
+        sofi_login,
+        enumerate(accounts, start=1),
+        max_workers=browser_workers(len(accounts)),
+    )
+    if any(result is True for result in results):
+        # Set logged-in status in the order object, not the brokerage object
+        orderObj.set_logged_in(sofi_obj, "sofi")
     return None
 
 
@@ -202,58 +232,52 @@ def sofi_init(
         attempts = 0
         while attempts < max_attempts:
             try:
-                page = sofi_loop.run_until_complete(browser.get("https://www.sofi.com/"))
-                sofi_loop.run_until_complete(browser.sleep(5))  # Give page time to load
+                page = sofi_loop.run(browser.get("https://www.sofi.com/"))
+                sofi_loop.run(browser.sleep(5))  # Give page time to load
                 
                 # Wait for page to load and check body element
-                sofi_loop.run_until_complete(browser.sleep(3))
+                sofi_loop.run(browser.sleep(3))
                 try:
-                    await_body = sofi_loop.run_until_complete(page.select("body"))
+                    await_body = sofi_loop.run(page.select("body"))
                     if await_body:
-                        current_url = sofi_loop.run_until_complete(
-                            get_current_url(page, discord_loop)
-                        )
+                        current_url = sofi_loop.run(get_current_url(page, discord_loop))
                         if current_url and "sofi.com" in current_url.lower():
                             break
                 except Exception as e:
                     print(f"Waiting for body element: {e}")
             except Exception as e:
                 print(f"Attempt {attempts + 1} failed: {e}")
-                sofi_loop.run_until_complete(browser.sleep(2))
+                sofi_loop.run(browser.sleep(2))
             
             attempts += 1
             if attempts == max_attempts:
                 raise Exception("Failed to load SoFi homepage after multiple attempts")
 
         # Load cookies
-        sofi_loop.run_until_complete(page)  # Wait for events to be processed
-        page = sofi_loop.run_until_complete(browser.get("https://www.sofi.com"))
-        sofi_loop.run_until_complete(browser.sleep(5))
-        cookies_loaded = sofi_loop.run_until_complete(
+        sofi_loop.run(wait_for_events(page))
+        page = sofi_loop.run(browser.get("https://www.sofi.com"))
+        sofi_loop.run(browser.sleep(5))
+        cookies_loaded = sofi_loop.run(
             load_cookies_from_pkl(browser, page, cookie_filename)
         )
 
         if cookies_loaded:
-            sofi_loop.run_until_complete(page.get("https://www.sofi.com/wealth/app/"))
-            sofi_loop.run_until_complete(browser.sleep(5))
-            sofi_loop.run_until_complete(page.select("body"))
-            current_url = sofi_loop.run_until_complete(
-                get_current_url(page, discord_loop)
-            )
+            sofi_loop.run(page.get("https://www.sofi.com/wealth/app/"))
+            sofi_loop.run(browser.sleep(5))
+            sofi_loop.run(page.select("body"))
+            current_url = sofi_loop.run(get_current_url(page, discord_loop))
 
             if current_url and "overview" in current_url:
-                sofi_loop.run_until_complete(
-                    save_cookies_to_pkl(browser, cookie_filename)
-                )
+                sofi_loop.run(save_cookies_to_pkl(browser, cookie_filename))
                 return sofi_obj
 
         # Proceed with login if cookies are invalid or expired
-        sofi_loop.run_until_complete(
+        sofi_loop.run(
             sofi_login_and_account(browser, page, account, name, botObj, discord_loop)
         )
         sofi_obj.set_logged_in_object(name, browser)
     except Exception as e:
-        sofi_loop.run_until_complete(
+        sofi_loop.run(
             sofi_error(
                 f"Error during SoFi init process: {e}",
                 page=page,
@@ -416,7 +440,7 @@ async def sofi_login_and_account(browser, page, account, name, botObj, discord_l
         )
 
 
-async def sofi_account_info(browser, discord_loop):
+async def sofi_account_info(browser, http: HTTPClient, discord_loop):
     try:
         print("Starting account info fetch...")
         await browser.sleep(5)
@@ -455,9 +479,9 @@ async def sofi_account_info(browser, discord_loop):
         print("Fetching accounts using working endpoint...")
         
         # Use the old working endpoint directly (new v3 endpoint returns 404)
-        response = requests.get(
+        response = await asyncio.to_thread(
+            http.get,
             "https://www.sofi.com/wealth/backend/v1/json/accounts",
-            impersonate="chrome",
             headers=build_headers(csrf_token),
             cookies=cookies_dict,
         )
@@ -489,10 +513,8 @@ async def sofi_account_info(browser, discord_loop):
         return None
 
 
-def sofi_holdings(browser, name, sofi_obj: Brokerage, discord_loop):
-    account_dict: dict = sofi_loop.run_until_complete(
-        sofi_account_info(browser, discord_loop)
-    )
+def sofi_holdings(browser, http: HTTPClient, name, sofi_obj: Brokerage, discord_loop):
+    account_dict: dict = sofi_loop.run(sofi_account_info(browser, http, discord_loop))
     if not account_dict:
         raise Exception(f"Failed to retrieve account info for {name}")
 
@@ -504,15 +526,13 @@ def sofi_holdings(browser, name, sofi_obj: Brokerage, discord_loop):
         account_id = account_info.get("id")
         cookies = {
             cookie.name: cookie.value
-            for cookie in sofi_loop.run_until_complete(browser.cookies.get_all())
+            for cookie in sofi_loop.run(browser.cookies.get_all())
         }
 
         try:
-            holdings = sofi_loop.run_until_complete(
-                get_holdings_formatted(account_id, cookies)
-            )
+            holdings = sofi_loop.run(get_holdings_formatted(http, account_id, cookies))
         except Exception as e:
-            sofi_loop.run_until_complete(
+            sofi_loop.run(
                 sofi_error(
                     f"Error fetching holdings for SOFI account {maskString(account_id)}: {e}",
                     discord_loop=discord_loop,
@@ -536,10 +556,10 @@ def sofi_holdings(browser, name, sofi_obj: Brokerage, discord_loop):
     printHoldings(sofi_obj, discord_loop)
 
 
-async def get_holdings_formatted(account_id, cookies):
+async def get_holdings_formatted(http: HTTPClient, account_id, cookies):
     holdings_url = f"https://www.sofi.com/wealth/backend/api/v3/account/{account_id}/holdings?accountDataType=INTERNAL"
-    response = requests.get(
-        holdings_url, impersonate="chrome", headers=build_headers(), cookies=cookies
+    response = await asyncio.to_thread(
+        http.get, holdings_url, headers=build_headers(), cookies=cookies
     )
 
     if response.status_code != 200:
@@ -647,15 +667,12 @@ async def handle_2fa(page, account, name, botObj, discord_loop):
             try:
                 sms_text = await page.find("We've sent a text message to:", best_match=True)
                 if sms_text:
-                    if botObj is not None and discord_loop is not None:
-                        sms_code = asyncio.run_coroutine_threadsafe(
-                            getOTPCodeDiscord(botObj, name, timeout=300, loop=discord_loop),
-                            discord_loop,
-                        ).result()
-                        if sms_code is None:
-                            raise Exception(f"Sofi {name} SMS code not received in time...")
-                    else:
-                        sms_code = input("Enter code: ")
+                    # Wait in another thread so other logins keep running on the loop
+                    sms_code = await asyncio.to_thread(
+                        getOTPCode, botObj, name, timeout=300, loop=discord_loop
+                    )
+                    if sms_code is None:
+                        raise Exception(f"Sofi {name} SMS code not received in time...")
                     await twofa_input.send_keys(sms_code)
                 else:
                     raise Exception(f"No valid 2FA method found for {name}")
@@ -683,22 +700,30 @@ async def handle_2fa(page, account, name, botObj, discord_loop):
         )
 
 
-def sofi_transaction(browser, orderObj: stockOrder, discord_loop):
+def sofi_transaction(browser, http: HTTPClient, orderObj: stockOrder, discord_loop):
     dry_mode = orderObj.get_dry()
+    # Logging in can take long enough for the connection to go idle
+    prewarm_connection("https://www.sofi.com/", http.get_session())
     for stock in orderObj.get_stocks():
         if orderObj.get_action() == "buy":
-            sofi_loop.run_until_complete(
-                sofi_buy(browser, stock, orderObj.get_amount(), discord_loop, dry_mode)
+            sofi_loop.run(
+                sofi_buy(
+                    browser, http, stock, orderObj.get_amount(), discord_loop, dry_mode
+                )
             )
         elif orderObj.get_action() == "sell":
-            sofi_loop.run_until_complete(
-                sofi_sell(browser, stock, orderObj.get_amount(), discord_loop, dry_mode)
+            sofi_loop.run(
+                sofi_sell(
+                    browser, http, stock, orderObj.get_amount(), discord_loop, dry_mode
+                )
             )
         else:
             print(f"Unknown action: {orderObj.get_action()}")
 
 
-async def sofi_buy(browser, symbol, quantity, discord_loop, dry_mode=False):
+async def sofi_buy(
+    browser, http: HTTPClient, symbol, quantity, discord_loop, dry_mode=False
+):
     page = None
     try:
         # Step 1: Navigate to stock page and get valid cookies
@@ -724,7 +749,7 @@ async def sofi_buy(browser, symbol, quantity, discord_loop, dry_mode=False):
         limit_price = stock_price
 
         # Step 3: Fetch all funded accounts and their buying power
-        accounts = await fetch_funded_accounts(cookies)
+        accounts = await fetch_funded_accounts(http, cookies)
         if not accounts:
             raise Exception("Failed to retrieve funded accounts or none available.")
 
@@ -746,6 +771,7 @@ async def sofi_buy(browser, symbol, quantity, discord_loop, dry_mode=False):
 
                 if quantity < 1:
                     result = await place_fractional_order(
+                        http,
                         symbol,
                         quantity,
                         account_id,
@@ -756,6 +782,7 @@ async def sofi_buy(browser, symbol, quantity, discord_loop, dry_mode=False):
                     )
                 else:
                     result = await place_order(
+                        http,
                         symbol,
                         quantity,
                         limit_price,
@@ -783,7 +810,9 @@ async def sofi_buy(browser, symbol, quantity, discord_loop, dry_mode=False):
         )
 
 
-async def sofi_sell(browser, symbol, quantity, discord_loop, dry_mode=False):
+async def sofi_sell(
+    browser, http: HTTPClient, symbol, quantity, discord_loop, dry_mode=False
+):
     try:
         # Step 1: Fetch holdings for the stock symbol
         cookies = {
@@ -798,8 +827,8 @@ async def sofi_sell(browser, symbol, quantity, discord_loop, dry_mode=False):
 
         # First try the customer holdings endpoint
         holdings_url = f"https://www.sofi.com/wealth/backend/api/v3/customer/holdings/symbol/{symbol}"
-        response = requests.get(
-            holdings_url, impersonate="chrome", headers=build_headers(), cookies=cookies
+        response = await asyncio.to_thread(
+            http.get, holdings_url, headers=build_headers(), cookies=cookies
         )
 
         account_holding_infos = []
@@ -815,8 +844,9 @@ async def sofi_sell(browser, symbol, quantity, discord_loop, dry_mode=False):
             
             # Get all accounts first
             accounts_url = "https://www.sofi.com/wealth/backend/api/v3/account/list"
-            accounts_response = requests.get(
-                accounts_url, impersonate="chrome", headers=build_headers(csrf_token), cookies=cookies
+            accounts_response = await asyncio.to_thread(
+                http.get,
+                accounts_url, headers=build_headers(csrf_token), cookies=cookies
             )
             
             if accounts_response.status_code == 200:
@@ -828,8 +858,9 @@ async def sofi_sell(browser, symbol, quantity, discord_loop, dry_mode=False):
                     account_id = account["id"]
                     try:
                         account_holdings_url = f"https://www.sofi.com/wealth/backend/api/v3/account/{account_id}/holdings?accountDataType=INTERNAL"
-                        account_response = requests.get(
-                            account_holdings_url, impersonate="chrome", headers=build_headers(), cookies=cookies
+                        account_response = await asyncio.to_thread(
+                            http.get,
+                            account_holdings_url, headers=build_headers(), cookies=cookies
                         )
                         
                         if account_response.status_code == 200:
@@ -905,6 +936,7 @@ async def sofi_sell(browser, symbol, quantity, discord_loop, dry_mode=False):
 
             if quantity < 1:
                 result = await place_fractional_order(
+                    http,
                     symbol,
                     quantity,
                     account_id,
@@ -916,6 +948,7 @@ async def sofi_sell(browser, symbol, quantity, discord_loop, dry_mode=False):
             else:
                 # Place the sell order
                 result = await place_order(
+                    http,
                     symbol,
                     quantity,
                     limit_price,
@@ -943,13 +976,13 @@ async def sofi_sell(browser, symbol, quantity, discord_loop, dry_mode=False):
         )
 
 
-async def fetch_funded_accounts(cookies):
+async def fetch_funded_accounts(http: HTTPClient, cookies):
     try:
         url = (
             "https://www.sofi.com/wealth/backend/api/v1/user/funded-brokerage-accounts"
         )
-        response = requests.get(
-            url, impersonate="chrome", headers=build_headers(), cookies=cookies
+        response = await asyncio.to_thread(
+            http.get, url, headers=build_headers(), cookies=cookies
         )
         if response.status_code == 200:
             accounts = response.json()
@@ -961,21 +994,27 @@ async def fetch_funded_accounts(cookies):
         return None
 
 
-async def fetch_stock_price(symbol):
-    try:
-        url = f"https://www.sofi.com/wealth/backend/api/v1/tearsheet/quote?symbol={symbol}&productSubtype=BROKERAGE"
-        response = requests.get(url, impersonate="chrome", headers=build_headers())
-        if response.status_code == 200:
-            data = response.json()
-            price = data.get("price")
-            if price:
-                # Round the price to the nearest second decimal place
-                rounded_price = round(float(price), 2)
-                return rounded_price
-            return None
+def sofi_quote(symbol):
+    # Get quote fields for the shared quote cache
+    url = f"https://www.sofi.com/wealth/backend/api/v1/tearsheet/quote?symbol={symbol}&productSubtype=BROKERAGE"
+    response = sofi_http.get(url, headers=build_headers())
+    if response.status_code != 200:
         print(
             f"Failed to fetch stock price for {symbol}. Status code: {response.status_code}"
         )
+        return {}
+    return {"last": response.json().get("price")}
+
+
+async def fetch_stock_price(symbol):
+    try:
+        price = await asyncio.to_thread(
+            quote_cache.get_quote, symbol, "last", sofi_quote
+        )
+        if price:
+            # Round the price to the nearest second decimal place
+            rounded_price = round(float(price), 2)
+            return rounded_price
         return None
     except Exception as e:
         await sofi_error(f"Error fetching stock price for {symbol}: {e}")
@@ -983,6 +1022,7 @@ async def fetch_stock_price(symbol):
 
 
 async def place_order(
+    http: HTTPClient,
     symbol,
     quantity,
     limit_price,
@@ -1005,9 +1045,9 @@ async def place_order(
         }
 
         url = "https://www.sofi.com/wealth/backend/api/v1/trade/order"
-        response = requests.post(
+        response = await asyncio.to_thread(
+            http.post,
             url,
-            impersonate="chrome",
             json=payload,
             headers=build_headers(csrf_token),
             cookies=cookies,
@@ -1031,7 +1071,14 @@ async def place_order(
 
 
 async def place_fractional_order(
-    symbol, quantity, account_id, order_type, cookies, csrf_token, discord_loop=None
+    http: HTTPClient,
+    symbol,
+    quantity,
+    account_id,
+    order_type,
+    cookies,
+    csrf_token,
+    discord_loop=None,
 ):
     try:
         # Step 1: Fetch the current stock price to calculate cashAmount
@@ -1059,9 +1106,9 @@ async def place_fractional_order(
 
         # Step 3: Send the request to sell fractional shares
         url = "https://www.sofi.com/wealth/backend/api/v1/trade/order-fractional"
-        response = requests.post(
+        response = await asyncio.to_thread(
+            http.post,
             url,
-            impersonate="chrome",
             json=payload,
             headers=build_headers(csrf_token),
             cookies=cookies,
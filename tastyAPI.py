@@ -15,17 +15,41 @@ from tastytrade.order import NewOrder, OrderAction, OrderTimeInForce, OrderType
 from tastytrade.streamer import DXLinkStreamer
 from tastytrade.utils import TastytradeError
 
-from helperAPI import Brokerage, maskString, printAndDiscord, printHoldings, stockOrder
+from helperAPI import (
+    MAX_WORKERS,
+    AsyncLoopThread,
+    Brokerage,
+    maskString,
+    printAndDiscord,
+    printHoldings,
+    quote_cache,
+    run_parallel,
+    stockOrder,
+)
 
+# Tastytrade calls run on one long-lived event loop
+tasty_loop = AsyncLoopThread("tastytrade")
 
-def order_setup(tt: Session, order_type, stock_price, stock, amount):
-    symbol = Equity.get_equity(tt, stock)
-    if order_type[2] == "Buy to Open":
-        leg = symbol.build_leg(D(amount), OrderAction.BUY_TO_OPEN)
-    elif order_type[2] == "Sell to Close":
-        leg = symbol.build_leg(D(amount), OrderAction.SELL_TO_CLOSE)
-    else:
-        raise ValueError("Invalid order type")
+
+async def build_legs(tt: Session, stocks: list, order_type, amount) -> dict:
+    # Instruments don't depend on the account, so resolve each symbol once
+    legs = {}
+    for stock in stocks:
+        try:
+            symbol = await Equity.a_get_equity(tt, stock)
+        except TastytradeError as te:
+            print(f"Tastytrade: Error getting {stock}: {te}")
+            continue
+        if order_type[2] == "Buy to Open":
+            legs[stock] = symbol.build_leg(D(amount), OrderAction.BUY_TO_OPEN)
+        elif order_type[2] == "Sell to Close":
+            legs[stock] = symbol.build_leg(D(amount), OrderAction.SELL_TO_CLOSE)
+        else:
+            raise ValueError("Invalid order type")
+    return legs
+
+
+def order_setup(leg, order_type, stock_price):
     new_order = NewOrder(
         time_in_force=OrderTimeInForce.DAY,
         order_type=OrderType.MARKET,
@@ -35,7 +59,30 @@ def order_setup(tt: Session, order_type, stock_price, stock, amount):
     return new_order
 
 
-def tastytrade_init(TASTYTRADE_EXTERNAL=None):
+def tastytrade_balances(tasty: Session, an: list) -> list:
+    balances = run_parallel(lambda acct: acct.get_balances(tasty), an)
+    for balance in balances:
+        if isinstance(balance, Exception):
+            raise balance
+    return balances
+
+
+def tastytrade_login(account: str, mode="holdings"):
+    # Log in and get balances for one set of credentials
+    account = account.strip().split(":")
+    tasty = Session(account[0], account[1])
+    an = Account.get_accounts(tasty)
+    # Balances aren't needed to place orders, so wait until they are read
+    balances = None if mode == "transaction" else tastytrade_balances(tasty, an)
+    return tasty, an, balances
+
+
+def tastytrade_set_totals(tasty_obj: Brokerage, name, an, balances):
+    for acct, balance in zip(an, balances):
+        tasty_obj.set_account_totals(name, acct.account_number, balance.cash_balance)
+
+
+def tastytrade_init(TASTYTRADE_EXTERNAL=None, mode="holdings"):
     # Initialize .env file
     load_dotenv()
     # Import Tastytrade account
@@ -48,27 +95,31 @@ def tastytrade_init(TASTYTRADE_EXTERNAL=None):
         else TASTYTRADE_EXTERNAL.strip().split(",")
     )
     tasty_obj = Brokerage("Tastytrade")
-    # Log in to Tastytrade account
+    # Log in to all Tastytrade accounts at once
     print("Logging in to Tastytrade...")
-    for account in accounts:
-        index = accounts.index(account) + 1
-        account = account.strip().split(":")
-        name = f"Tastytrade {index}"
-        try:
-            tasty = Session(account[0], account[1])
-            tasty_obj.set_logged_in_object(name, tasty, "session")
-            an = Account.get_accounts(tasty)
-            tasty_obj.set_logged_in_object(name, an, "accounts")
-            for acct in an:
-                tasty_obj.set_account_number(name, acct.account_number)
-                tasty_obj.set_account_totals(
-                    name, acct.account_number, acct.get_balances(tasty).cash_balance
-                )
-            print("Logged in to Tastytrade!")
-        except Exception as e:
-            traceback.print_exc()
-            print(f"Error logging in to {name}: {e}")
+    logins = run_parallel(lambda account: tastytrade_login(account, mode), accounts)
+    for index, login in enumerate(logins):
+        name = f"Tastytrade {index + 1}"
+        if isinstance(login, Exception):
+            traceback.print_exception(login)
+            print(f"Error logging in to {name}: {login}")
             return None
+        tasty, an, balances = login
+        tasty_obj.set_logged_in_object(name, tasty, "session")
+        tasty_obj.set_logged_in_object(name, an, "accounts")
+        for acct in an:
+            tasty_obj.set_account_number(name, acct.account_number)
+            tasty_obj.set_account_totals(name, acct.account_number, 0)
+        if balances is None:
+            tasty_obj.set_loader(
+                name,
+                lambda name=name, tasty=tasty, an=an: tastytrade_set_totals(
+                    tasty_obj, name, an, tastytrade_balances(tasty, an)
+                ),
+            )
+        else:
+            tastytrade_set_totals(tasty_obj, name, an, balances)
+        print(f"Logged in to {name}!")
     return tasty_obj
 
 
@@ -94,105 +145,185 @@ def tastytrade_holdings(tt_o: Brokerage, loop=None):
     printHoldings(tt_o, loop=loop)
 
 
+class TastyQuoteStreamer:
+    def __init__(self, session: Session):
+        self.__session: Session = session
+        self.__streamer: DXLinkStreamer = None
+        self.__quotes: dict = {}  # Dictionary of symbol to latest Quote
+        self.__profiles: dict = {}  # Dictionary of symbol to latest Profile
+        self.__tasks: list = []  # Listener tasks filling the tables
+
+    async def start(self, symbols: list):
+        # Open one websocket and subscribe to every order symbol up front
+        self.__streamer = await DXLinkStreamer(self.__session)
+        await self.__streamer.subscribe(Profile, symbols)
+        await self.__streamer.subscribe(Quote, symbols)
+        self.__tasks = [
+            asyncio.create_task(self.__listen(Profile, self.__profiles)),
+            asyncio.create_task(self.__listen(Quote, self.__quotes)),
+        ]
+
+    async def __listen(self, event_class, table: dict):
+        async for event in self.__streamer.listen(event_class):
+            table[event.event_symbol] = event
+            if event_class is Quote:
+                quote_cache.set_quote(
+                    event.event_symbol, ask=event.ask_price, bid=event.bid_price
+                )
+
+    async def get_limit_price(self, symbol: str, action: str, timeout=5) -> D | None:
+        # Read the live tables, only waiting if the first events haven't arrived
+        waited = 0
+        while symbol not in self.__quotes or symbol not in self.__profiles:
+            if self.__streamer is None or waited >= timeout:
+                break
+            await asyncio.sleep(0.05)
+            waited += 0.05
+        profile: Profile = self.__profiles.get(symbol)
+        quote: Quote = self.__quotes.get(symbol)
+        if action == "buy":
+            limit = profile.high_limit_price if profile is not None else None
+            fallback = quote.ask_price if quote is not None else None
+        else:
+            limit = profile.low_limit_price if profile is not None else None
+            fallback = quote.bid_price if quote is not None else None
+        price = limit if limit is not None else fallback
+        return D(price) if price is not None else None
+
+    async def close(self):
+        for task in self.__tasks:
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        if self.__streamer is not None:
+            await self.__streamer.close()
+
+
 async def tastytrade_execute(tt_o: Brokerage, orderObj: stockOrder, loop=None):
     print()
     print("==============================")
     print("Tastytrade")
     print("==============================")
     print()
+    # One quote streamer per session for limit order fallbacks
+    streamers = {}
+    for key in tt_o.get_account_numbers():
+        streamers[key] = TastyQuoteStreamer(tt_o.get_logged_in_objects(key, "session"))
+        try:
+            await streamers[key].start(orderObj.get_stocks())
+        except Exception as e:
+            print(f"{key}: Error starting quote streamer: {e}")
+    try:
+        await tastytrade_place_orders(tt_o, orderObj, streamers, loop)
+    finally:
+        for streamer in streamers.values():
+            try:
+                await streamer.close()
+            except Exception as e:
+                print(f"Error closing quote streamer: {e}")
+
+
+async def tastytrade_place_order(
+    key: str,
+    obj: Session,
+    acct: Account,
+    s: str,
+    leg,
+    orderObj: stockOrder,
+    streamer: TastyQuoteStreamer,
+    limiter: asyncio.Semaphore,
+) -> str:
+    print_account = maskString(acct.account_number)
+    async with limiter:
+        try:
+            # Set order type
+            if orderObj.get_action() == "buy":
+                order_type = ["Market", "Debit", "Buy to Open"]
+            else:
+                order_type = ["Market", "Credit", "Sell to Close"]
+            # Set stock price
+            stock_price = 0
+            # Skip day trade check for now
+            # Place order
+            new_order = order_setup(leg, order_type, stock_price)
+            try:
+                placed_order = await acct.a_place_order(
+                    obj, new_order, dry_run=orderObj.get_dry()
+                )
+                order_status = placed_order.order.status.value
+            except Exception as e:
+                return f"{key} {print_account}: Error placing order: {e}"
+            # Check order status
+            if order_status == "Rejected":
+                # Retry with limit order from the live quote table
+                print(
+                    f"{key} {print_account} Error: {order_status} Trying Limit order..."
+                )
+                stock_price = await streamer.get_limit_price(s, orderObj.get_action())
+                if stock_price is None:
+                    return f"{key} {print_account}: Error getting limit price for {s}"
+                print(f"{s} limit price is: ${round(stock_price, 2)}")
+                # Retry order
+                new_order = order_setup(leg, order_type, stock_price)
+                placed_order = await acct.a_place_order(
+                    obj, new_order, dry_run=orderObj.get_dry()
+                )
+                order_status = placed_order.order.status.value
+            if order_status in ["Received", "Routed"]:
+                if orderObj.get_dry():
+                    return f"{key} Running in DRY mode. Transaction would've been: {orderObj.get_action()} {orderObj.get_amount()} of {s}"
+                return f"{key} {print_account}: {orderObj.get_action()} {orderObj.get_amount()} of {s} Order: {placed_order.order.id} Status: {order_status}"
+            # Only want this message if it fails both orders.
+            return f"{key} Error placing order: {placed_order.order.id} on account {print_account}: {order_status}"
+        except (TastytradeError, KeyError) as te:
+            return f"{key} {print_account}: Error: {te}"
+
+
+async def tastytrade_place_orders(
+    tt_o: Brokerage, orderObj: stockOrder, streamers: dict, loop=None
+):
+    if orderObj.get_action() == "buy":
+        order_type = ["Market", "Debit", "Buy to Open"]
+    else:
+        order_type = ["Market", "Credit", "Sell to Close"]
+    # Build each symbol's order leg once for every account
+    if not tt_o.get_account_numbers():
+        printAndDiscord("Tastytrade: No accounts logged in", loop=loop)
+        return
+    first_key = list(tt_o.get_account_numbers())[0]
+    legs = await build_legs(
+        tt_o.get_logged_in_objects(first_key, "session"),
+        orderObj.get_stocks(),
+        order_type,
+        orderObj.get_amount(),
+    )
+    # Submit every account's orders at once, limited to MAX_WORKERS at a time
+    limiter = asyncio.Semaphore(MAX_WORKERS)
+    orders = []
+    order_accounts = []
     for s in orderObj.get_stocks():
+        printAndDiscord(
+            f"Tastytrade: {orderObj.get_action()}ing {orderObj.get_amount()} of {s}",
+            loop=loop,
+        )
+        if s not in legs:
+            printAndDiscord(f"Tastytrade: Error: {s} not found", loop=loop)
+            continue
         for key in tt_o.get_account_numbers():
             obj: Session = tt_o.get_logged_in_objects(key, "session")
-            accounts: Account = tt_o.get_logged_in_objects(key, "accounts")
-            printAndDiscord(
-                f"{key}: {orderObj.get_action()}ing {orderObj.get_amount()} of {s}",
-                loop=loop,
-            )
-            for i, acct in enumerate(tt_o.get_account_numbers(key)):
-                print_account = maskString(acct)
-                try:
-                    acct: Account = accounts[i]
-                    # Set order type
-                    if orderObj.get_action() == "buy":
-                        order_type = ["Market", "Debit", "Buy to Open"]
-                    else:
-                        order_type = ["Market", "Credit", "Sell to Close"]
-                    # Set stock price
-                    stock_price = 0
-                    # Skip day trade check for now
-                    # Place order
-                    new_order = order_setup(
-                        obj, order_type, stock_price, s, orderObj.get_amount()
+            for acct in tt_o.get_logged_in_objects(key, "accounts"):
+                orders.append(
+                    tastytrade_place_order(
+                        key, obj, acct, s, legs[s], orderObj, streamers[key], limiter
                     )
-                    try:
-                        placed_order = acct.place_order(
-                            obj, new_order, dry_run=orderObj.get_dry()
-                        )
-                        order_status = placed_order.order.status.value
-                    except Exception as e:
-                        printAndDiscord(
-                            f"{key} {print_account}: Error placing order: {e}",
-                            loop=loop,
-                        )
-                        continue
-                    # Check order status
-                    if order_status in ["Received", "Routed"]:
-                        message = f"{key} {print_account}: {orderObj.get_action()} {orderObj.get_amount()} of {s} Order: {placed_order.order.id} Status: {order_status}"
-                        if orderObj.get_dry():
-                            message = f"{key} Running in DRY mode. Transaction would've been: {orderObj.get_action()} {orderObj.get_amount()} of {s}"
-                        printAndDiscord(message, loop=loop)
-                    elif order_status == "Rejected":
-                        # Retry with limit order
-                        streamer = await DXLinkStreamer.create(obj)
-                        stock_limit = await streamer.subscribe(Profile, [s])
-                        stock_quote = await streamer.subscribe(Quote, [s])
-                        stock_limit = await streamer.get_event(Profile)
-                        stock_quote = await streamer.get_event(Quote)
-                        printAndDiscord(
-                            f"{key} {print_account} Error: {order_status} Trying Limit order...",
-                            loop=loop,
-                        )
-                        # Get limit price
-                        if orderObj.get_action() == "buy":
-                            stock_limit = D(stock_limit.highLimitPrice)
-                            stock_price = (
-                                D(stock_quote.askPrice)
-                                if stock_limit.is_nan()
-                                else stock_limit
-                            )
-                            order_type = ["Market", "Debit", "Buy to Open"]
-                        elif orderObj.get_action() == "sell":
-                            stock_limit = D(stock_limit.lowLimitPrice)
-                            stock_price = (
-                                D(stock_quote.bidPrice)
-                                if stock_limit.is_nan()
-                                else stock_limit
-                            )
-                            order_type = ["Market", "Credit", "Sell to Close"]
-                        print(f"{s} limit price is: ${round(stock_price, 2)}")
-                        # Retry order
-                        new_order = order_setup(
-                            obj, order_type, stock_price, s, orderObj.get_amount()
-                        )
-                        placed_order = acct.place_order(
-                            obj, new_order, dry_run=orderObj.get_dry()
-                        )
-                        # Check order status
-                        if order_status in ["Received", "Routed"]:
-                            message = f"{key} {print_account}: {orderObj.get_action()} {orderObj.get_amount()} of {s} Order: {placed_order.order.id} Status: {order_status}"
-                            if orderObj.get_dry():
-                                message = f"{key} Running in DRY mode. Transaction would've been: {orderObj.get_action()} {orderObj.get_amount()} of {s}"
-                            printAndDiscord(message, loop=loop)
-                        elif order_status == "Rejected":
-                            # Only want this message if it fails both orders.
-                            printAndDiscord(
-                                f"{key} Error placing order: {placed_order.order.id} on account {print_account}: {order_status}",
-                                loop=loop,
-                            )
-                except (TastytradeError, KeyError) as te:
-                    printAndDiscord(f"{key} {print_account}: Error: {te}", loop=loop)
-                    continue
+                )
+                order_accounts.append(f"{key} {maskString(acct.account_number)}")
+    results = await asyncio.gather(*orders, return_exceptions=True)
+    # Report results in account order
+    for account, message in zip(order_accounts, results):
+        if isinstance(message, Exception):
+            message = f"{account}: Error placing order: {message}"
+        printAndDiscord(message, loop=loop)
 
 
 def tastytrade_transaction(tt: Brokerage, orderObj: stockOrder, loop=None):
-    asyncio.run(tastytrade_execute(tt_o=tt, orderObj=orderObj, loop=loop))
+    tasty_loop.run(tastytrade_execute(tt_o=tt, orderObj=orderObj, loop=loop))
@@ -1,7 +1,6 @@
 import datetime
 import os
 import traceback
-from time import sleep
 
 from dotenv import load_dotenv
 from selenium import webdriver
@@ -13,11 +12,15 @@ from selenium.webdriver.support.wait import WebDriverWait
 from helperAPI import (
     Brokerage,
     check_if_page_loaded,
+    discardDriver,
     getDriver,
     killSeleniumDriver,
+    load_json_cache,
     printAndDiscord,
     printHoldings,
-    stockOrder
+    save_json_cache,
+    stockOrder,
+    wait_for_any,
 )
 
 load_dotenv()
@@ -45,11 +48,17 @@ def tornado_init(TORNADO_EXTERNAL=None, DOCKER=False, loop=None):
     for index, account in enumerate(accounts):
         account_name = f"Tornado {index + 1}"
         try:
-            driver = getDriver(DOCKER)
+            driver = getDriver(DOCKER, profile=f"tornado:{account.split(':')[0]}")
             if driver is None:
                 raise Exception("Driver not found.")
             driver.get("https://tornado.com/app/login")
             WebDriverWait(driver, 30).until(check_if_page_loaded)
+            # A pooled driver may still be logged in from the last run
+            if "login" not in driver.current_url:
+                print(f"{account_name}: Reusing logged in browser")
+                TORNADO_obj.set_logged_in_object(account_name, driver)
+                TORNADO_obj.set_account_number(account_name, account_name)
+                continue
 
             # Log in with email and password
             try:
@@ -92,63 +101,60 @@ def tornado_init(TORNADO_EXTERNAL=None, DOCKER=False, loop=None):
                 printAndDiscord(
                     f"TimeoutException: Login failed for {account_name}.", loop
                 )
+                discardDriver(driver)
+                killSeleniumDriver(TORNADO_obj)
                 return False
 
         except Exception:
             tornado_error(driver, loop)
-            driver.close()
-            driver.quit()
+            discardDriver(driver)
+            killSeleniumDriver(TORNADO_obj)
             return None
     return TORNADO_obj
 
 
+# Read the ticker, shares and price text of every holding in one WebDriver call
+HOLDINGS_SCRIPT = """
+    const text = (node, path) => {
+        const found = document.evaluate(
+            path, node, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+        return found ? found.innerText.trim() : null;
+    };
+    return Array.from(document.querySelectorAll("div[class='sc-jEWLvH evXkie']")).map(
+        holding => [
+            text(holding, ".//a[1]/div[1]/span"),
+            text(holding, ".//a[4]/div/div/span/span"),
+            text(holding, ".//a[1]/div[3]/span/div/div[1]/span"),
+        ]
+    );
+"""
+
+
 def tornado_extract_holdings(driver):
     holdings_data = []
     try:
-        # Locate all the individual stock holdings elements
-        holdings_elements = driver.find_elements(
-            By.XPATH, ".//div[@class='sc-jEWLvH evXkie']"
-        )
-
-        if len(holdings_elements) == 0:
-            return holdings_data
-
-        for holding_element in holdings_elements:
-            try:
-                # Extract the stock ticker
-                stock_ticker = holding_element.find_element(
-                    By.XPATH, ".//a[1]/div[1]/span"
-                ).text.strip()
-
-                # Extract the number of shares available
-                shares = holding_element.find_element(
-                    By.XPATH, ".//a[4]/div/div/span/span"
-                ).text.strip()
-                shares_float = float(shares.replace(" sh", ""))
-
-                # Corrected XPath to extract the actual stock price
-                price = holding_element.find_element(
-                    By.XPATH, ".//a[1]/div[3]/span/div/div[1]/span"
-                ).text.strip()
-                price_float = float(price.replace("$", "").replace(",", ""))
-
-                # Store the extracted data in a dictionary
-                holdings_data.append(
-                    {
-                        "stock_ticker": stock_ticker,
-                        "shares": shares_float,
-                        "price": price_float,
-                    }
-                )
-
-            except Exception:
-                tornado_error(driver)
-                continue
-
+        rows = driver.execute_script(HOLDINGS_SCRIPT) or []
     except Exception:
         tornado_error(driver)
         return []
 
+    for stock_ticker, shares, price in rows:
+        try:
+            # Missing text means the holding's layout changed
+            if stock_ticker is None:
+                raise Exception("Stock ticker not found")
+            holdings_data.append(
+                {
+                    "stock_ticker": stock_ticker,
+                    "shares": float(shares.replace(" sh", "")),
+                    "price": float(price.replace("$", "").replace(",", "")),
+                }
+            )
+        except Exception:
+            tornado_error(driver)
+            continue
+
     return holdings_data
 
 
@@ -202,76 +208,99 @@ def tornado_holdings(Tornado_o: Brokerage, loop=None):
     killSeleniumDriver(Tornado_o)  # Close the browser after processing
 
 
+def tornado_search_security(driver, s, loop=None) -> bool:
+    # Find the security with the search bar, which is on every app page
+    try:
+        search_field = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "#nav_securities_search"))
+        )
+    except TimeoutException:
+        # Not on an app page, go to the dashboard and try again
+        driver.get("https://tornado.com/app/")
+        WebDriverWait(driver, 30).until(check_if_page_loaded)
+        try:
+            search_field = WebDriverWait(driver, 20).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, "#nav_securities_search"))
+            )
+        except TimeoutException:
+            tornado_error(driver, loop)
+            printAndDiscord(f"Tornado search field not found for {s}.", loop)
+            return False
+    search_field.click()
+    search_field.send_keys(s)
+
+    def find_result(driver):
+        # Results keep updating while typing, so look for the exact ticker
+        for item in driver.find_elements(
+            By.XPATH, '//*[@id="nav_securities_search_container"]/div[2]/ul/li'
+        ):
+            if item.find_element(By.CLASS_NAME, "bold").text.strip() == s:
+                return item
+        return None
+
+    try:
+        # Wait for and process search results
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located(
+                (
+                    By.XPATH,
+                    '//*[@id="nav_securities_search_container"]/div[2]/ul/li',
+                )
+            )
+        )
+        outcome, item = wait_for_any(driver, {"found": (find_result, 3)})
+        if outcome is None:
+            printAndDiscord(f"Tornado doesn't have {s}.", loop)
+            return False
+        item.click()
+        return True
+    except TimeoutException:
+        tornado_error(driver, loop)
+        printAndDiscord(f"Tornado search results did not appear for {s}.", loop)
+        return False
+
+
+def tornado_open_security(driver, s, routes: dict, loop=None) -> bool:
+    # Go straight to the security's page if its route is known
+    # The buy button shows on every security page, even with no shares to sell
+    button = "buy-button"
+    if routes.get(s):
+        driver.get(routes[s])
+        try:
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.ID, button))
+            )
+            return True
+        except TimeoutException:
+            print(f"Saved Tornado route for {s} no longer works, searching...")
+            routes.pop(s, None)
+    if not tornado_search_security(driver, s, loop):
+        return False
+    try:
+        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, button)))
+        routes[s] = driver.current_url
+    except TimeoutException:
+        pass
+    return True
+
+
 def tornado_transaction(Tornado_o: Brokerage, orderObj: stockOrder, loop=None):
     print("\n==============================")
     print("Tornado")
     print("==============================\n")
 
+    # Trade page URL for each ticker, saved across runs
+    routes = load_json_cache("tornado_routes.json")
     for s in orderObj.get_stocks():
         for key in Tornado_o.get_account_numbers():
             driver = Tornado_o.get_logged_in_objects(key)
 
-            # Ensure we are on the Tornado dashboard or navigate to it
             try:
-                current_url = driver.current_url
-                if "app" not in current_url:
-                    driver.get("https://tornado.com/app/")
-                    WebDriverWait(driver, 30).until(check_if_page_loaded)
-            except Exception as e:
-                tornado_error(driver, loop)
-                printAndDiscord(f"Failed to navigate to dashboard for {key}: {e}", loop)
-                continue
-
-            try:
-                # Interact with the search bar
-                search_field = WebDriverWait(driver, 20).until(
-                    EC.element_to_be_clickable(
-                        (By.CSS_SELECTOR, "#nav_securities_search")
-                    )
-                )
-                search_field.click()
-                sleep(1)
-                search_field.send_keys(s)
-            except TimeoutException:
-                tornado_error(driver, loop)
-                printAndDiscord(f"Tornado search field not found for {s}.", loop)
-                continue
-
-            try:
-                # Wait for and process search results
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located(
-                        (
-                            By.XPATH,
-                            '//*[@id="nav_securities_search_container"]/div[2]/ul/li',
-                        )
-                    )
-                )
-                dropdown_items = driver.find_elements(
-                    By.XPATH, '//*[@id="nav_securities_search_container"]/div[2]/ul/li'
-                )
-                total_items = len(dropdown_items)
-                sleep(2)
-
-                if total_items == 0:
-                    printAndDiscord(f"Tornado doesn't have {s}.", loop)
-                    continue
-
-                found_stock = False
-                for item in dropdown_items:
-                    ticker_name = item.find_element(By.CLASS_NAME, "bold").text.strip()
-                    if ticker_name == s:
-                        found_stock = True
-                        sleep(1)
-                        item.click()
-                        break
-
-                if not found_stock:
-                    printAndDiscord(f"Tornado doesn't have {s}.", loop)
+                if not tornado_open_security(driver, s, routes, loop):
                     continue
-            except TimeoutException:
+            except Exception as e:
                 tornado_error(driver, loop)
-                printAndDiscord(f"Tornado search results did not appear for {s}.", loop)
+                printAndDiscord(f"Failed to open {s} for {key}: {e}", loop)
                 continue
 
             # Proceed with the transaction based on the action (buy/sell)
@@ -280,31 +309,7 @@ def tornado_transaction(Tornado_o: Brokerage, orderObj: stockOrder, loop=None):
             elif orderObj.get_action() == "sell":
                 handle_sell(driver, s, orderObj, loop)
 
-            # Ensure to return to the dashboard after every transaction
-            try:
-                dashboard_link = WebDriverWait(driver, 30).until(
-                    EC.element_to_be_clickable(
-                        (
-                            By.XPATH,
-                            '//*[@id="root"]/div/div/div[4]/div/div[1]/div/div/div[2]/div[1]/div[2]/span[1]/a/span',
-                        )
-                    )
-                )
-                dashboard_link.click()
-                WebDriverWait(driver, 60).until(
-                    EC.presence_of_element_located(
-                        (
-                            By.XPATH,
-                            '//*[@id="main-router"]/div/div/div/div[1]/div/div/div/div[1]/div[1]/div/span',
-                        )
-                    )
-                )
-            except TimeoutException:
-                tornado_error(driver, loop)
-                printAndDiscord(
-                    f"Tornado failed to return to dashboard after processing {s}.", loop
-                )
-
+    save_json_cache(routes, "tornado_routes.json")
     print("Completed all transactions, Exiting...")
     killSeleniumDriver(Tornado_o)
 
@@ -337,13 +342,25 @@ def handle_buy(driver, stock, orderObj, loop):
         printAndDiscord(f"Tornado failed to enter quantity for {stock}.", loop)
         return
 
-    try:
-        current_shares_element = driver.find_element(
-            By.XPATH, '//*[@id="main-router"]/div[1]/div/div[4]/div'
-        )
-        has_current_shares = bool("sh" in current_shares_element.text.strip())
-    except NoSuchElementException:
-        has_current_shares = False
+    # The order form has an extra row for current shares if already held
+    outcome, _ = wait_for_any(
+        driver,
+        {
+            "held": (
+                EC.text_to_be_present_in_element(
+                    (By.XPATH, '//*[@id="main-router"]/div[1]/div/div[4]/div'), "sh"
+                ),
+                5,
+            ),
+            "new": (
+                EC.presence_of_element_located(
+                    (By.XPATH, '//*[@id="main-router"]/div[1]/div/div[4]/select')
+                ),
+                5,
+            ),
+        },
+    )
+    has_current_shares = outcome == "held"
 
     market_order_xpath = (
         '//*[@id="main-router"]/div[1]/div/div[5]/select/option[1]'
@@ -372,9 +389,16 @@ def handle_buy(driver, stock, orderObj, loop):
         return
 
     try:
-        sleep(3)
-        buy_power = driver.find_element(By.XPATH, buy_power_xpath).text.strip()
-        cost = driver.find_element(By.XPATH, current_price_xpath).text.strip()
+        buy_power = (
+            WebDriverWait(driver, 10)
+            .until(EC.presence_of_element_located((By.XPATH, buy_power_xpath)))
+            .text.strip()
+        )
+        cost = (
+            WebDriverWait(driver, 10)
+            .until(EC.presence_of_element_located((By.XPATH, current_price_xpath)))
+            .text.strip()
+        )
 
         # Validate and convert buy power
         buy_power_float = float(buy_power.replace("$", "").replace(",", ""))
@@ -440,7 +464,6 @@ def handle_buy(driver, stock, orderObj, loop):
                 loop,
             )
     else:
-        sleep(5)
         printAndDiscord(
             f"DRY MODE: Simulated order BUY for {QUANTITY} shares of {stock} at {cost}",
             loop,
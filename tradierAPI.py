@@ -6,38 +6,39 @@ import os
 import traceback
 from time import sleep
 
-import requests
 from dotenv import load_dotenv
 
-from helperAPI import Brokerage, maskString, printAndDiscord, printHoldings, stockOrder
+from helperAPI import (
+    Brokerage,
+    get_http_client,
+    maskString,
+    printAndDiscord,
+    printHoldings,
+    quote_cache,
+    register_prewarm,
+    stockOrder,
+)
+
+register_prewarm("tradier", "https://api.tradier.com/v1/")
 
 
 def make_request(
     endpoint, BEARER_TOKEN, data=None, params=None, method="GET"
 ) -> dict | None:
+    response = None
     try:
-        if method == "GET":
-            response = requests.get(
-                f"https://api.tradier.com/v1/{endpoint}",
-                data=data,
-                params=params,
-                headers={
-                    "Authorization": f"Bearer {BEARER_TOKEN}",
-                    "Accept": "application/json",
-                },
-            )
-        elif method == "POST":
-            response = requests.post(
-                f"https://api.tradier.com/v1/{endpoint}",
-                data=data,
-                params=params,
-                headers={
-                    "Authorization": f"Bearer {BEARER_TOKEN}",
-                    "Accept": "application/json",
-                },
-            )
-        else:
+        if method not in ["GET", "POST"]:
             raise Exception(f"Invalid method: {method}")
+        response = get_http_client("api.tradier.com").request(
+            method,
+            f"https://api.tradier.com/v1/{endpoint}",
+            data=data,
+            params=params,
+            headers={
+                "Authorization": f"Bearer {BEARER_TOKEN}",
+                "Accept": "application/json",
+            },
+        )
         if response.status_code != 200:
             raise Exception(f"Status code: {response.status_code}")
         json_response = response.json()
@@ -53,7 +54,32 @@ def make_request(
         return None
 
 
-def tradier_init(TRADIER_EXTERNAL=None):
+def tradier_quote(symbol, BEARER_TOKEN) -> dict:
+    # Get quote fields for the shared quote cache
+    price_response = make_request(
+        "markets/quotes",
+        BEARER_TOKEN,
+        params={"symbols": symbol, "greeks": "false"},
+    )
+    if price_response is None or price_response["quotes"].get("quote") is None:
+        return {}
+    quote = price_response["quotes"]["quote"]
+    return {
+        "last": quote.get("last"),
+        "ask": quote.get("ask"),
+        "bid": quote.get("bid"),
+    }
+
+
+def tradier_balances(tradier_obj: Brokerage, name, an, account):
+    json_balances = make_request(f"accounts/{an}/balances", account)
+    if json_balances is None:
+        tradier_obj.set_account_totals(name, an, 0)
+        return
+    tradier_obj.set_account_totals(name, an, json_balances["balances"]["total_equity"])
+
+
+def tradier_init(TRADIER_EXTERNAL=None, mode="holdings"):
     # Initialize .env file
     load_dotenv()
     # Import Tradier account
@@ -80,6 +106,7 @@ def tradier_init(TRADIER_EXTERNAL=None):
         else:
             account_num = len(json_response["profile"]["account"])
         print(f"Tradier accounts found: {account_num}")
+        account_numbers = []
         for x in range(account_num):
             if account_num == 1:
                 an = json_response["profile"]["account"]["account_number"]
@@ -95,16 +122,19 @@ def tradier_init(TRADIER_EXTERNAL=None):
             print(maskString(an))
             tradier_obj.set_account_number(name, an)
             tradier_obj.set_account_type(name, an, at)
-            # Get balances
-            json_balances = make_request(f"accounts/{an}/balances", account)
-            if json_balances is None:
-                tradier_obj.set_account_totals(name, an, 0)
-                continue
-            tradier_obj.set_account_totals(
-                name, an, json_balances["balances"]["total_equity"]
-            )
-        # Get balances
+            tradier_obj.set_account_totals(name, an, 0)
+            account_numbers.append(an)
         tradier_obj.set_logged_in_object(name, account)
+
+        # Get balances, waiting until they are needed when trading
+        def load_balances(name=name, account=account, account_numbers=account_numbers):
+            for an in account_numbers:
+                tradier_balances(tradier_obj, name, an, account)
+
+        if mode == "transaction":
+            tradier_obj.set_loader(name, load_balances)
+        else:
+            load_balances()
     print("Logged in to Tradier!")
     return tradier_obj
 
@@ -138,19 +168,10 @@ def tradier_holdings(tradier_o: Brokerage, loop=None):
                 # Get current price of each stock
                 current_price = []
                 for sym in stocks:
-                    price_response = make_request(
-                        "markets/quotes",
-                        obj,
-                        params={"symbols": sym, "greeks": "false"},
+                    price = quote_cache.get_quote(
+                        sym, "last", lambda s: tradier_quote(s, obj)
                     )
-                    if (
-                        price_response is None
-                        or price_response["quotes"].get("quote") is None
-                        or price_response["quotes"]["quote"].get("last") is None
-                    ):
-                        current_price.append(0)
-                    else:
-                        current_price.append(price_response["quotes"]["quote"]["last"])
+                    current_price.append(0 if price is None else price)
                 # Print and send them
                 for position in stocks:
                     # Set index for easy use
@@ -1,7 +1,6 @@
 # Donald Ryan Gullett(MaxxRK)
 # Vanguard API
 
-import asyncio
 import os
 import pprint
 import traceback
@@ -12,10 +11,12 @@ from vanguard import order, session
 
 from helperAPI import (
     Brokerage,
-    getOTPCodeDiscord,
+    browser_workers,
+    getOTPCode,
     maskString,
     printAndDiscord,
     printHoldings,
+    run_parallel,
     stockOrder,
 )
 
@@ -33,8 +34,9 @@ def vanguard_run(orderObj: stockOrder, command=None, botObj=None, loop=None):
     # Set the functions to be run
     _, second_command = command
 
-    for account in accounts:
-        index = accounts.index(account) + 1
+    def vanguard_login(index_account):
+        # Log in and run the command for one set of login info
+        index, account = index_account
         success = vanguard_init(
             account=account,
             index=index,
@@ -42,12 +44,25 @@ def vanguard_run(orderObj: stockOrder, command=None, botObj=None, loop=None):
             botObj=botObj,
             loop=loop,
         )
-        if success is not None:
-            orderObj.set_logged_in(success, "vanguard")
-            if second_command == "_holdings":
-                vanguard_holdings(success, loop=loop)
-            else:
-                vanguard_transaction(success, orderObj, loop=loop)
+        if success is None:
+            return None
+        if second_command == "_holdings":
+            vanguard_holdings(success, loop=loop)
+        else:
+            vanguard_transaction(success, orderObj, loop=loop)
+        return success
+
+    # Each login runs its own browser
+    results = run_parallel(
+        vanguard_login,
+        enumerate(accounts, start=1),
+        max_workers=browser_workers(len(accounts)),
+    )
+    for index, result in enumerate(results, start=1):
+        if isinstance(result, Exception):
+            print(f"Error in Vanguard {index}: {result}")
+        elif result is not None:
+            orderObj.set_logged_in(result, "vanguard")
     return None
 
 
@@ -67,17 +82,10 @@ def vanguard_init(account, index, headless=True, botObj=None, loop=None):
         )
         need_second = vg_session.login(account[0], account[1], account[2])
         if need_second:
-            if botObj is None and loop is None:
-                vg_session.login_two(input("Enter code: "))
-            else:
-                sms_code = asyncio.run_coroutine_threadsafe(
-                    getOTPCodeDiscord(botObj, name, timeout=120, loop=loop), loop
-                ).result()
-                if sms_code is None:
-                    raise Exception(
-                        f"Vanguard {index} code not received in time...", loop
-                    )
-                vg_session.login_two(sms_code)
+            sms_code = getOTPCode(botObj, name, timeout=120, loop=loop)
+            if sms_code is None:
+                raise Exception(f"Vanguard {index} code not received in time...", loop)
+            vg_session.login_two(sms_code)
         all_accounts = vg_account.AllAccount(vg_session)
         success = all_accounts.get_account_ids()
         if not success:
@@ -1,6 +1,7 @@
 # Nelson Dane
 # Webull API
 
+import copy
 import os
 import traceback
 from time import sleep
@@ -8,7 +9,16 @@ from time import sleep
 from dotenv import load_dotenv
 from webull import webull
 
-from helperAPI import Brokerage, maskString, printAndDiscord, printHoldings, stockOrder
+from helperAPI import (
+    Brokerage,
+    load_json_cache,
+    maskString,
+    printAndDiscord,
+    printHoldings,
+    run_parallel,
+    save_json_cache,
+    stockOrder,
+)
 
 MAX_WB_RETRIES = 3  # Number of times to retry logging in if not successful
 MAX_WB_ACCOUNTS = 11  # Different account types
@@ -29,6 +39,48 @@ def place_order(obj: webull, account: str, orderObj: stockOrder, s: str):
     return True
 
 
+def get_account_details(obj: webull, internal_account: str) -> dict:
+    # Webull keeps the current account on the object, so give each
+    # account its own copy to look them up at the same time
+    account_obj = copy.copy(obj)
+    account_obj.set_account_id(internal_account)
+    return account_obj.get_account(v2=True)["accountSummaryVO"]
+
+
+def webull_login(account: list, cached_accounts: list):
+    for i in range(MAX_WB_RETRIES):
+        wb = webull()
+        wb.set_did(account[2])
+        wb.login(account[0], account[1])
+        wb.get_trade_token(account[3])
+        id_test = wb.get_account_id(0)
+        if id_test is not None:
+            break
+        if i == MAX_WB_RETRIES - 1:
+            raise Exception(f"Unable to log in after {i+1} tries. Check credentials.")
+    # Only re-verify balances if the accounts were found on a previous run
+    details = []
+    if cached_accounts:
+        internal_accounts = [cached["id"] for cached in cached_accounts]
+        details = run_parallel(
+            lambda id: get_account_details(wb, id), internal_accounts
+        )
+    if details == [] or any(isinstance(d, Exception) for d in details):
+        internal_accounts = []
+        for i in range(MAX_WB_ACCOUNTS):
+            id = wb.get_account_id(i)
+            if id is None:
+                break
+            internal_accounts.append(id)
+        details = run_parallel(
+            lambda id: get_account_details(wb, id), internal_accounts
+        )
+        for d in details:
+            if isinstance(d, Exception):
+                raise d
+    return wb, internal_accounts, details
+
+
 # Initialize Webull
 def webull_init(WEBULL_EXTERNAL=None):
     # Initialize .env file
@@ -43,51 +95,48 @@ def webull_init(WEBULL_EXTERNAL=None):
         if WEBULL_EXTERNAL is None
         else WEBULL_EXTERNAL.strip().split(",")
     )
+    accounts = [account.split(":") for account in accounts]
     for index, account in enumerate(accounts):
-        print("Logging in to Webull...")
-        name = f"Webull {index + 1}"
-        account = account.split(":")
         if len(account) != 4:
             print(
-                f"Invalid number of parameters for {name}, got {len(account)}, expected 4"
+                f"Invalid number of parameters for Webull {index + 1}, got {len(account)}, expected 4"
             )
             return None
-        try:
-            for i in range(MAX_WB_RETRIES):
-                wb = webull()
-                wb.set_did(account[2])
-                wb.login(account[0], account[1])
-                wb.get_trade_token(account[3])
-                id_test = wb.get_account_id(0)
-                if id_test is not None:
-                    break
-                if i == MAX_WB_RETRIES - 1:
-                    raise Exception(
-                        f"Unable to log in to {name} after {i+1} tries. Check credentials."
-                    )
-            wb_obj.set_logged_in_object(name, wb, "wb")
-            wb_obj.set_logged_in_object(name, account[3], "trading_pin")
-            # Get all accounts
-            for i in range(MAX_WB_ACCOUNTS):
-                id = wb.get_account_id(i)
-                if id is None:
-                    break
-                # Webull uses a different internal account ID than displayed in app
-                ac = wb.get_account(v2=True)["accountSummaryVO"]
-                wb_obj.set_account_number(name, ac["accountNumber"])
-                print(maskString(ac["accountNumber"]))
-                wb_obj.set_logged_in_object(name, id, ac["accountNumber"])
-                wb_obj.set_account_type(
-                    name, ac["accountNumber"], ac["accountTypeName"]
-                )
-                wb_obj.set_account_totals(
-                    name, ac["accountNumber"], ac["netLiquidationValue"]
-                )
-        except Exception as e:
-            print(traceback.format_exc())
-            print(f"Error: Unable to log in to Webull: {e}")
+    # Log in to all Webull accounts at once
+    print("Logging in to Webull...")
+    account_cache = load_json_cache("webull_accounts.json")
+    logins = run_parallel(
+        lambda account: webull_login(account, account_cache.get(account[0], [])),
+        accounts,
+    )
+    for index, (account, login) in enumerate(zip(accounts, logins)):
+        name = f"Webull {index + 1}"
+        if isinstance(login, Exception):
+            traceback.print_exception(login)
+            print(f"Error: Unable to log in to {name}: {login}")
             return None
-        print("Logged in to Webull!")
+        wb, internal_accounts, details = login
+        wb_obj.set_logged_in_object(name, wb, "wb")
+        wb_obj.set_logged_in_object(name, account[3], "trading_pin")
+        account_cache[account[0]] = []
+        for id, ac in zip(internal_accounts, details):
+            # Webull uses a different internal account ID than displayed in app
+            wb_obj.set_account_number(name, ac["accountNumber"])
+            print(maskString(ac["accountNumber"]))
+            wb_obj.set_logged_in_object(name, id, ac["accountNumber"])
+            wb_obj.set_account_type(name, ac["accountNumber"], ac["accountTypeName"])
+            wb_obj.set_account_totals(
+                name, ac["accountNumber"], ac["netLiquidationValue"]
+            )
+            account_cache[account[0]].append(
+                {
+                    "id": id,
+                    "number": ac["accountNumber"],
+                    "type": ac["accountTypeName"],
+                }
+            )
+        print(f"Logged in to {name}!")
+    save_json_cache(account_cache, "webull_accounts.json")
     return wb_obj
 
 
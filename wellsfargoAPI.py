@@ -1,17 +1,21 @@
 import asyncio
 import datetime
+import hashlib
 import os
 import pickle
 import re
 import traceback
-from time import sleep
+from time import perf_counter, sleep, time
 
 from dotenv import load_dotenv
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright
+from playwright_stealth import StealthConfig, stealth_sync
 from selenium import webdriver
 from selenium.common.exceptions import (
     ElementNotInteractableException,
-    NoSuchElementException,
     TimeoutException,
+    WebDriverException,
 )
 from selenium.webdriver import Keys
 from selenium.webdriver.common.by import By
@@ -19,15 +23,19 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
 from helperAPI import (
+    HEADLESS,
     Brokerage,
     check_if_page_loaded,
+    discardDriver,
     getDriver,
     getOTPCodeDiscord,
     killSeleniumDriver,
     printAndDiscord,
     printHoldings,
     stockOrder,
+    timing_report,
     type_slowly,
+    wait_for_any,
 )
 
 
@@ -41,6 +49,62 @@ def wellsfargo_error(driver: webdriver, error: str):
     print(traceback.format_exc())
 
 
+ACCOUNTS_URL = "https://connect.secure.wellsfargo.com/accounts/start"
+
+
+def wellsfargo_session_path(username: str, suffix="") -> str:
+    # Each login keeps its own session, named without exposing the username
+    digest = hashlib.sha256(username.encode()).hexdigest()[:12]
+    return os.path.join("creds", f"wellsfargo_{digest}{suffix}")
+
+
+def wellsfargo_load_cookies(driver: webdriver, cookie_file: str) -> int:
+    # Add the unexpired saved cookies to the browser, returning how many were added
+    if not os.path.exists(cookie_file):
+        return 0
+    try:
+        with open(cookie_file, "rb") as f:
+            cookies = pickle.load(f)
+    except Exception as e:
+        print(f"Error loading cookies: {e}")
+        return 0
+    now = time()
+    cookies = [cookie for cookie in cookies if cookie.get("expiry", now + 1) > now]
+    if not cookies:
+        return 0
+    driver.get("https://connect.secure.wellsfargo.com")
+    added = 0
+    for cookie in cookies:
+        try:
+            driver.add_cookie(cookie)
+            added += 1
+        except WebDriverException:
+            pass
+    return added
+
+
+def wellsfargo_session_valid(driver: webdriver, cookie_file: str) -> bool:
+    # Open the accounts page once: a live session shows the dashboard,
+    # an expired one is redirected to the login form
+    wellsfargo_load_cookies(driver, cookie_file)
+    driver.get(ACCOUNTS_URL)
+    outcome, _ = wait_for_any(
+        driver,
+        {
+            "dashboard": (
+                EC.presence_of_element_located((By.LINK_TEXT, "Locations")),
+                20,
+            ),
+            "login": (
+                lambda driver: "/auth/login" in driver.current_url
+                or driver.find_elements(By.ID, "j_username"),
+                20,
+            ),
+        },
+    )
+    return outcome == "dashboard"
+
+
 def wellsfargo_init(botObj, WELLSFARGO_EXTERNAL=None, DOCKER=False, loop=None):
     load_dotenv()
 
@@ -52,95 +116,115 @@ def wellsfargo_init(botObj, WELLSFARGO_EXTERNAL=None, DOCKER=False, loop=None):
         if WELLSFARGO_EXTERNAL is None
         else WELLSFARGO_EXTERNAL.strip().split(",")
     )
+    if wellsfargo_backend() == "playwright":
+        return wellsfargo_playwright_init(botObj, accounts, DOCKER, loop)
     WELLSFARGO_obj = Brokerage("WELLSFARGO")
-    
-    # Add cookie persistence
-    cookie_file = os.path.join("creds", f"wellsfargo_cookies_{datetime.datetime.now().strftime('%Y%m%d')}.pkl")
-    
+
     for account in accounts:
         index = accounts.index(account) + 1
         name = f"WELLSFARGO {index}"
         account = account.split(":")
-        
+
         # Implement exponential backoff for retries
         max_retries = 3
         retry_delay = 1
         for retry in range(max_retries):
             try:
                 printAndDiscord("Logging into WELLS FARGO...", loop)
-                driver = getDriver(DOCKER)
+                start = perf_counter()
+                driver = getDriver(DOCKER, profile=f"wellsfargo:{account[0]}")
                 if driver is None:
                     raise Exception("Driver not found.")
-                
-                # Load cookies if they exist
-                if os.path.exists(cookie_file):
-                    try:
-                        driver.get("https://connect.secure.wellsfargo.com")
-                        cookies = pickle.load(open(cookie_file, "rb"))
-                        for cookie in cookies:
-                            driver.add_cookie(cookie)
-                    except Exception as e:
-                        print(f"Error loading cookies: {e}")
-                
-                driver.get("https://connect.secure.wellsfargo.com/auth/login/present")
-                WebDriverWait(driver, 20).until(check_if_page_loaded)
-                # Login
-                try:
-                    username_field = driver.find_element(By.XPATH, "//*[@id='j_username']")
-                    type_slowly(username_field, account[0])
-                    # Wait for the password field and enter the password
-                    password_field = driver.find_element(By.XPATH, "//*[@id='j_password']")
-                    type_slowly(password_field, account[1])
 
-                    login_button = WebDriverWait(driver, 20).until(
-                        EC.element_to_be_clickable(
-                            (By.CSS_SELECTOR, ".Button__modern___cqCp7")
+                # Reuse this login's saved session if it is still valid
+                cookie_file = wellsfargo_session_path(account[0], ".pkl")
+                if wellsfargo_session_valid(driver, cookie_file):
+                    print(f"{name}: Reusing saved session")
+                else:
+                    if "/auth/login" not in driver.current_url:
+                        driver.get(
+                            "https://connect.secure.wellsfargo.com/auth/login/present"
                         )
-                    )
-                    login_button.click()
                     WebDriverWait(driver, 20).until(check_if_page_loaded)
-                    print("=====================================================\n")
-                except TimeoutException:
-                    print("TimeoutException: Login failed.")
-                    return False
+                    # Login
+                    try:
+                        username_field = driver.find_element(
+                            By.XPATH, "//*[@id='j_username']"
+                        )
+                        type_slowly(username_field, account[0])
+                        # Wait for the password field and enter the password
+                        password_field = driver.find_element(
+                            By.XPATH, "//*[@id='j_password']"
+                        )
+                        type_slowly(password_field, account[1])
 
-                WELLSFARGO_obj.set_logged_in_object(name, driver)
-                
-                try:
-                    auth_popup = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located(
-                            (
-                                By.CSS_SELECTOR,
-                                ".ResponsiveModalContent__modalContent___guT3p",
+                        login_button = WebDriverWait(driver, 20).until(
+                            EC.element_to_be_clickable(
+                                (By.CSS_SELECTOR, ".Button__modern___cqCp7")
                             )
                         )
+                        login_button.click()
+                        WebDriverWait(driver, 20).until(check_if_page_loaded)
+                        print("=====================================================\n")
+                    except TimeoutException:
+                        print("TimeoutException: Login failed.")
+                        discardDriver(driver)
+                        killSeleniumDriver(WELLSFARGO_obj)
+                        return False
+
+                    # Either the OTP popup or the signed in dashboard shows up
+                    outcome, auth_popup = wait_for_any(
+                        driver,
+                        {
+                            "otp": (
+                                EC.presence_of_element_located(
+                                    (
+                                        By.CSS_SELECTOR,
+                                        ".ResponsiveModalContent__modalContent___guT3p",
+                                    )
+                                ),
+                                10,
+                            ),
+                            "dashboard": (
+                                EC.presence_of_element_located(
+                                    (By.LINK_TEXT, "Locations")
+                                ),
+                                20,
+                            ),
+                        },
                     )
-                    auth_list = auth_popup.find_element(
-                        By.CSS_SELECTOR, ".LineItemLinkList__lineItemLinkList___Dj6vb"
-                    )
-                    li_elements = auth_list.find_elements(By.TAG_NAME, "li")
-                    for li in li_elements:
-                        if account[2] in li.text:
-                            li.click()
-                            break
-                    print("Clicked on phone number")
-                    # Get the OTP code from the user
-                    if botObj is not None and loop is not None:
-                        code = asyncio.run_coroutine_threadsafe(
-                            getOTPCodeDiscord(botObj, name, timeout=300, loop=loop),
-                            loop,
-                        ).result()
-                    else:
-                        code = input("Enter security code: ")
-                    code_input = WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.ID, "otp"))
-                    )
-                    code_input.send_keys(code)
-                    WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']"))
-                    ).click()
-                except TimeoutException:
-                    pass
+                    try:
+                        if outcome != "otp":
+                            raise TimeoutException("No OTP popup")
+                        auth_list = auth_popup.find_element(
+                            By.CSS_SELECTOR,
+                            ".LineItemLinkList__lineItemLinkList___Dj6vb",
+                        )
+                        li_elements = auth_list.find_elements(By.TAG_NAME, "li")
+                        for li in li_elements:
+                            if account[2] in li.text:
+                                li.click()
+                                break
+                        print("Clicked on phone number")
+                        # Get the OTP code from the user
+                        if botObj is not None and loop is not None:
+                            code = asyncio.run_coroutine_threadsafe(
+                                getOTPCodeDiscord(botObj, name, timeout=300, loop=loop),
+                                loop,
+                            ).result()
+                        else:
+                            code = input("Enter security code: ")
+                        code_input = WebDriverWait(driver, 20).until(
+                            EC.presence_of_element_located((By.ID, "otp"))
+                        )
+                        code_input.send_keys(code)
+                        WebDriverWait(driver, 10).until(
+                            EC.element_to_be_clickable(
+                                (By.XPATH, "//button[@type='submit']")
+                            )
+                        ).click()
+                    except TimeoutException:
+                        pass
 
                 try:
                     WebDriverWait(driver, 20).until(
@@ -149,10 +233,11 @@ def wellsfargo_init(botObj, WELLSFARGO_EXTERNAL=None, DOCKER=False, loop=None):
                 except TimeoutException:
                     print("Could not verify login success")
                     raise
-                
+
                 # Save cookies after successful login
                 try:
-                    pickle.dump(driver.get_cookies(), open(cookie_file, "wb"))
+                    with open(cookie_file, "wb") as f:
+                        pickle.dump(driver.get_cookies(), f)
                 except Exception as e:
                     print(f"Error saving cookies: {e}")
 
@@ -169,36 +254,80 @@ def wellsfargo_init(botObj, WELLSFARGO_EXTERNAL=None, DOCKER=False, loop=None):
                     balance_element = account_block.find_element(
                         By.CSS_SELECTOR, '[data-testid$="-balance"]'
                     )
-                    balance = float(balance_element.text.replace("$", "").replace(",", ""))
+                    balance = float(
+                        balance_element.text.replace("$", "").replace(",", "")
+                    )
                     WELLSFARGO_obj.set_account_totals(name, masked_number_text, balance)
+                timing_report.record(
+                    "wellsfargo selenium login", perf_counter() - start, "ok"
+                )
+                WELLSFARGO_obj.set_logged_in_object(name, driver)
 
             except TimeoutException:
                 if retry < max_retries - 1:
-                    wait_time = retry_delay * (2 ** retry)  # Exponential backoff
+                    wait_time = retry_delay * (2**retry)  # Exponential backoff
                     print(f"Timeout occurred, retrying in {wait_time} seconds...")
+                    # The retry gets a fresh driver
+                    discardDriver(driver)
                     sleep(wait_time)
                     continue
                 wellsfargo_error(driver, f"Timeout after {max_retries} retries")
-                driver.close()
-                driver.quit()
+                discardDriver(driver)
+                killSeleniumDriver(WELLSFARGO_obj)
                 return None
             except WebDriverException as e:
                 wellsfargo_error(driver, f"WebDriver error: {e}")
-                driver.close()
-                driver.quit()
+                discardDriver(driver)
+                killSeleniumDriver(WELLSFARGO_obj)
                 return None
             except Exception as e:
                 wellsfargo_error(driver, f"Unexpected error: {e}")
-                driver.close()
-                driver.quit()
+                discardDriver(driver)
+                killSeleniumDriver(WELLSFARGO_obj)
                 return None
             break  # Success - exit retry loop
     return WELLSFARGO_obj
 
 
+# Read the text of every cell in the positions table in one WebDriver call
+POSITIONS_SCRIPT = """
+    return Array.from(document.querySelectorAll('tbody tr')).map(
+        row => Array.from(row.querySelectorAll('td')).map(cell => cell.innerText)
+    );
+"""
+NUMBER_PATTERN = re.compile(r"-?\d+(\.\d+)?")
+
+
+def wellsfargo_parse_positions(rows: list) -> list:
+    # Turn table rows into (symbol, quantity, price)
+    positions = []
+    for cells in rows:
+        if len(cells) < 9:
+            continue
+        name = cells[1].split("\n")[0]
+        amount_match = NUMBER_PATTERN.search(
+            cells[3].replace("\n", "").replace(",", "")
+        )
+        price_match = NUMBER_PATTERN.search(cells[4].replace("\n", "").replace(",", ""))
+        amount = amount_match.group(0) if amount_match else "0"
+        price = price_match.group(0) if price_match else "0"
+        positions.append((name.strip(), float(amount), float(price)))
+    return positions
+
+
+def wellsfargo_read_positions(driver, WELLSFARGO_o: Brokerage, key, account_mask):
+    rows = driver.execute_script(POSITIONS_SCRIPT) or []
+    for name, amount, price in wellsfargo_parse_positions(rows):
+        WELLSFARGO_o.set_holdings(key, account_mask, name, amount, price)
+
+
 def wellsfargo_holdings(WELLSFARGO_o: Brokerage, loop=None):
+    if wellsfargo_uses_playwright(WELLSFARGO_o):
+        wellsfargo_playwright_holdings(WELLSFARGO_o, loop)
+        return
     for key in WELLSFARGO_o.get_account_numbers():
         driver: webdriver = WELLSFARGO_o.get_logged_in_objects(key)
+        start = perf_counter()
         try:
             brokerage = WebDriverWait(driver, 20).until(
                 EC.element_to_be_clickable((By.XPATH, "//*[@id='BROKERAGE_LINK7P']"))
@@ -210,13 +339,14 @@ def wellsfargo_holdings(WELLSFARGO_o: Brokerage, loop=None):
                 WebDriverWait(driver, 20).until_not(
                     EC.presence_of_element_located((By.CLASS_NAME, "wfa-lob"))
                 )
-                
+
                 more = WebDriverWait(driver, 20).until(
                     EC.element_to_be_clickable((By.LINK_TEXT, "Holdings Snapshot"))
                 )
                 driver.execute_script("arguments[0].scrollIntoView(true);", more)
-                sleep(2)  # Give more time for any animations to complete
-                driver.execute_script("arguments[0].click();", more)  # Use JavaScript click
+                driver.execute_script(
+                    "arguments[0].click();", more
+                )  # Use JavaScript click
                 position = WebDriverWait(driver, 10).until(
                     EC.element_to_be_clickable((By.ID, "btnpositions"))
                 )
@@ -226,14 +356,26 @@ def wellsfargo_holdings(WELLSFARGO_o: Brokerage, loop=None):
                 killSeleniumDriver(WELLSFARGO_o)
                 return
 
-            # Check if multi-account dropdown exists
-            try:
-                WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.XPATH, "//*[@id='dropdown1']"))
-                )
-                is_multi_account = True
-            except TimeoutException:
-                is_multi_account = False
+            # Check if multi-account dropdown exists, or the table loaded without it
+            outcome, _ = wait_for_any(
+                driver,
+                {
+                    "multi": (
+                        EC.presence_of_element_located(
+                            (By.XPATH, "//*[@id='dropdown1']")
+                        ),
+                        5,
+                    ),
+                    "single": (
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "tbody tr")),
+                        5,
+                    ),
+                },
+            )
+            is_multi_account = (
+                outcome == "multi"
+                or len(driver.find_elements(By.XPATH, "//*[@id='dropdown1']")) > 0
+            )
 
             account_masks = WELLSFARGO_o.get_account_numbers(key)
             if not account_masks:
@@ -258,10 +400,17 @@ def wellsfargo_holdings(WELLSFARGO_o: Brokerage, loop=None):
                         continue
                     try:
                         open_dropdown = WebDriverWait(driver, 20).until(
-                            EC.element_to_be_clickable((By.XPATH, "//*[@id='dropdown1']"))
+                            EC.element_to_be_clickable(
+                                (By.XPATH, "//*[@id='dropdown1']")
+                            )
                         )
                         open_dropdown.click()
-                        sleep(1)
+                        WebDriverWait(driver, 5).until(
+                            EC.presence_of_element_located(
+                                (By.CSS_SELECTOR, "#dropdownlist1 li")
+                            )
+                        )
+                        old_table = driver.find_elements(By.CSS_SELECTOR, "tbody")
                         find_account = """
                             var items = document.getElementById('dropdownlist1').getElementsByTagName('li');
                             for (var i = 0; i < items.length; i++) {
@@ -283,62 +432,28 @@ def wellsfargo_holdings(WELLSFARGO_o: Brokerage, loop=None):
                         killSeleniumDriver(WELLSFARGO_o)
                         continue
 
-                    sleep(1)
-                    rows = driver.find_elements(By.CSS_SELECTOR, "tbody tr")
-
-                    for row in rows:
-                        cells = row.find_elements(By.CSS_SELECTOR, "td")
-                        if len(cells) >= 9:
-                            name_match = re.search(r"^[^\n]*", cells[1].text)
-                            amount_match = re.search(
-                                r"-?\d+(\.\d+)?", cells[3].text.replace("\n", "")
-                            )
-                            price_match = re.search(
-                                r"-?\d+(\.\d+)?", cells[4].text.replace("\n", "")
-                            )
-                            name = name_match.group(0) if name_match else cells[1].text
-                            amount = amount_match.group(0) if amount_match else "0"
-                            price = price_match.group(0) if price_match else "0"
-
-                            WELLSFARGO_o.set_holdings(
-                                key,
-                                account_masks[account],
-                                name.strip(),
-                                float(amount),
-                                float(price),
-                            )
+                    # Wait for the new account's table to replace the old one
+                    if old_table:
+                        wait_for_any(
+                            driver, {"reloaded": (EC.staleness_of(old_table[0]), 1)}
+                        )
+                    wellsfargo_read_positions(
+                        driver, WELLSFARGO_o, key, account_masks[account]
+                    )
             else:
                 # Single account logic
-                current_mask = account_masks[0]
-                sleep(1)
-                rows = driver.find_elements(By.CSS_SELECTOR, "tbody tr")
-
-                for row in rows:
-                    cells = row.find_elements(By.CSS_SELECTOR, "td")
-                    if len(cells) >= 9:
-                        name_match = re.search(r"^[^\n]*", cells[1].text)
-                        amount_match = re.search(
-                            r"-?\d+(\.\d+)?", cells[3].text.replace("\n", "")
-                        )
-                        price_match = re.search(
-                            r"-?\d+(\.\d+)?", cells[4].text.replace("\n", "")
-                        )
-                        name = name_match.group(0) if name_match else cells[1].text
-                        amount = amount_match.group(0) if amount_match else "0"
-                        price = price_match.group(0) if price_match else "0"
-
-                        WELLSFARGO_o.set_holdings(
-                            key,
-                            current_mask,
-                            name.strip(),
-                            float(amount),
-                            float(price),
-                        )
+                WebDriverWait(driver, 5).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "tbody tr"))
+                )
+                wellsfargo_read_positions(driver, WELLSFARGO_o, key, account_masks[0])
 
         except TimeoutException:
             print("Could not get to holdings")
             killSeleniumDriver(WELLSFARGO_o)
             return
+        timing_report.record(
+            "wellsfargo selenium holdings", perf_counter() - start, "ok"
+        )
 
         printHoldings(WELLSFARGO_o, loop)
         killSeleniumDriver(WELLSFARGO_o)
@@ -350,6 +465,9 @@ def wellsfargo_transaction(WELLSFARGO_o: Brokerage, orderObj: stockOrder, loop=N
     print("WELLS FARGO")
     print("==============================")
     print()
+    if wellsfargo_uses_playwright(WELLSFARGO_o):
+        wellsfargo_playwright_transaction(WELLSFARGO_o, orderObj, loop)
+        return
 
     for key in WELLSFARGO_o.get_account_numbers():
         driver: webdriver = WELLSFARGO_o.get_logged_in_objects(key)
@@ -428,12 +546,26 @@ def wellsfargo_transaction(WELLSFARGO_o: Brokerage, orderObj: stockOrder, loop=N
                 select_account = driver.execute_script(
                     find_account, account_masks[account].replace("*", "")
                 )
-                sleep(2)
-                # Check for clear ticket prompt and accept
-                try:
-                    driver.find_element(By.ID, "btn-continue").click()
-                except (NoSuchElementException, ElementNotInteractableException):
-                    pass
+                # Check for clear ticket prompt and accept, or move on once
+                # the ticket is ready
+                outcome, prompt = wait_for_any(
+                    driver,
+                    {
+                        "prompt": (
+                            EC.element_to_be_clickable((By.ID, "btn-continue")),
+                            2,
+                        ),
+                        "ready": (
+                            EC.element_to_be_clickable((By.ID, "BuySellBtn")),
+                            2,
+                        ),
+                    },
+                )
+                if outcome == "prompt":
+                    try:
+                        prompt.click()
+                    except ElementNotInteractableException:
+                        pass
                 if select_account == -1:
                     print("Could not find the account with the specified text")
                     continue
@@ -461,7 +593,9 @@ def wellsfargo_transaction(WELLSFARGO_o: Brokerage, orderObj: stockOrder, loop=N
                         EC.element_to_be_clickable((By.ID, "btn-continue"))
                     )
                     dismiss_prompt.click()
-                sleep(2)
+                WebDriverWait(driver, 20).until(
+                    EC.presence_of_element_located((By.ID, "BuySellBtn"))
+                )
                 # idk why doing it through selenium doesnt work sometimes
                 driver.execute_script('document.getElementById("BuySellBtn").click()')
                 # Buy or Sell
@@ -481,7 +615,6 @@ def wellsfargo_transaction(WELLSFARGO_o: Brokerage, orderObj: stockOrder, loop=N
                     EC.element_to_be_clickable((By.ID, "actionbtnContinue"))
                 )
                 driver.execute_script("arguments[0].scrollIntoView(true);", review)
-                sleep(2)
                 ticker_box = WebDriverWait(driver, 20).until(
                     EC.element_to_be_clickable((By.ID, "Symbol"))
                 )
@@ -526,8 +659,9 @@ def wellsfargo_transaction(WELLSFARGO_o: Brokerage, orderObj: stockOrder, loop=N
 
                     # timing
                     driver.execute_script("document.getElementById('TIFBtn').click()")
-                    sleep(1)
-                    day = driver.find_element(By.LINK_TEXT, "Day")
+                    day = WebDriverWait(driver, 5).until(
+                        EC.element_to_be_clickable((By.LINK_TEXT, "Day"))
+                    )
                     day.click()
 
                 # preview
@@ -582,3 +716,298 @@ def wellsfargo_transaction(WELLSFARGO_o: Brokerage, orderObj: stockOrder, loop=N
                         EC.element_to_be_clickable((By.CSS_SELECTOR, "#btn-continue"))
                     ).click()
         killSeleniumDriver(WELLSFARGO_o)
+
+
+# Playwright backend, used when WELLSFARGO_BACKEND is "playwright"
+ACCOUNTS_SCRIPT = """
+    return Array.from(document.querySelectorAll('li[data-testid^="WELLSTRADE"]')).map(
+        block => [
+            block.querySelector('[data-testid$="-masked-number"]').innerText,
+            block.querySelector('[data-testid$="-balance"]').innerText,
+        ]
+    );
+"""
+
+
+def wellsfargo_backend() -> str:
+    return os.getenv("WELLSFARGO_BACKEND", "selenium").strip().lower()
+
+
+def wellsfargo_uses_playwright(WELLSFARGO_o: Brokerage) -> bool:
+    # Playwright logins are stored as a dict of playwright, context and page
+    return any(
+        isinstance(WELLSFARGO_o.get_logged_in_objects(key), dict)
+        for key in WELLSFARGO_o.get_account_numbers()
+    )
+
+
+def page_script(script: str) -> str:
+    # Run a Selenium style script body with Playwright's evaluate
+    return f"() => {{{script}}}"
+
+
+def wellsfargo_playwright_error(page, error: str):
+    print(f"Wells Fargo Error: {error}")
+    if page is not None:
+        try:
+            page.screenshot(path=f"wells-fargo-error-{datetime.datetime.now()}.png")
+        except Exception:
+            pass
+    print(traceback.format_exc())
+
+
+def wellsfargo_playwright_close(WELLSFARGO_o: Brokerage):
+    # Closing the persistent context writes the profile back to disk
+    for key in WELLSFARGO_o.get_account_numbers():
+        session = WELLSFARGO_o.get_logged_in_objects(key)
+        if not isinstance(session, dict):
+            continue
+        print(f"Closing browser for {key}")
+        try:
+            session["context"].close()
+            session["playwright"].stop()
+        except Exception as e:
+            print(f"Error closing browser for {key}: {e}")
+
+
+def wellsfargo_playwright_login(botObj, name, account, headless, loop=None):
+    playwright = sync_playwright().start()
+    # Each login keeps its own browser profile between runs
+    profile = os.path.abspath(wellsfargo_session_path(account[0], "_playwright"))
+    context = playwright.firefox.launch_persistent_context(profile, headless=headless)
+    page = context.pages[0] if context.pages else context.new_page()
+    stealth_sync(
+        page,
+        StealthConfig(
+            navigator_languages=False,
+            navigator_user_agent=False,
+            navigator_vendor=False,
+        ),
+    )
+    session = {"playwright": playwright, "context": context, "page": page}
+    try:
+        page.goto(ACCOUNTS_URL)
+        dashboard = page.get_by_role("link", name="Locations", exact=True)
+        username_field = page.locator("#j_username")
+        # A saved session goes straight to the dashboard, otherwise to the login form
+        dashboard.or_(username_field).first.wait_for(timeout=20000)
+        if not dashboard.is_visible():
+            username_field.fill(account[0])
+            page.locator("#j_password").fill(account[1])
+            page.locator(".Button__modern___cqCp7").click()
+            otp_popup = page.locator(".ResponsiveModalContent__modalContent___guT3p")
+            otp_popup.or_(dashboard).first.wait_for(timeout=20000)
+            if otp_popup.is_visible():
+                otp_popup.locator(
+                    ".LineItemLinkList__lineItemLinkList___Dj6vb li"
+                ).filter(has_text=account[2]).first.click()
+                print("Clicked on phone number")
+                if botObj is not None and loop is not None:
+                    code = asyncio.run_coroutine_threadsafe(
+                        getOTPCodeDiscord(botObj, name, timeout=300, loop=loop),
+                        loop,
+                    ).result()
+                else:
+                    code = input("Enter security code: ")
+                page.locator("#otp").fill(code)
+                page.locator("button[type='submit']").click()
+            dashboard.wait_for(timeout=20000)
+    except Exception:
+        context.close()
+        playwright.stop()
+        raise
+    return session
+
+
+def wellsfargo_playwright_init(botObj, accounts: list, DOCKER=False, loop=None):
+    WELLSFARGO_obj = Brokerage("WELLSFARGO")
+    # Docker has no display, so it always runs headless
+    headless = DOCKER or HEADLESS
+    for index, account in enumerate(accounts, start=1):
+        name = f"WELLSFARGO {index}"
+        account = account.split(":")
+        printAndDiscord("Logging into WELLS FARGO...", loop)
+        start = perf_counter()
+        try:
+            session = wellsfargo_playwright_login(botObj, name, account, headless, loop)
+        except Exception as e:
+            timing_report.record("wellsfargo playwright login", perf_counter() - start)
+            wellsfargo_playwright_error(None, f"{name} login failed: {e}")
+            continue
+        WELLSFARGO_obj.set_logged_in_object(name, session)
+        # TODO: This will not show accounts that do not have settled cash funds
+        for masked_number, balance in session["page"].evaluate(
+            page_script(ACCOUNTS_SCRIPT)
+        ):
+            masked_number = masked_number.replace(".", "*")
+            WELLSFARGO_obj.set_account_number(name, masked_number)
+            WELLSFARGO_obj.set_account_totals(
+                name, masked_number, float(balance.replace("$", "").replace(",", ""))
+            )
+        timing_report.record(
+            "wellsfargo playwright login", perf_counter() - start, "ok"
+        )
+    return WELLSFARGO_obj
+
+
+def wellsfargo_playwright_holdings(WELLSFARGO_o: Brokerage, loop=None):
+    for key in WELLSFARGO_o.get_account_numbers():
+        page = WELLSFARGO_o.get_logged_in_objects(key)["page"]
+        account_masks = WELLSFARGO_o.get_account_numbers(key)
+        start = perf_counter()
+        try:
+            page.locator("#BROKERAGE_LINK7P").click()
+            page.locator(".wfa-lob").wait_for(state="detached", timeout=20000)
+            page.get_by_role("link", name="Holdings Snapshot", exact=True).click()
+            page.locator("#btnpositions").click()
+            # Multi-account logins get a dropdown, single ones go straight to the table
+            dropdown = page.locator("#dropdown1")
+            dropdown.or_(page.locator("tbody tr")).first.wait_for(timeout=20000)
+            if dropdown.count() == 0:
+                rows = page.evaluate(page_script(POSITIONS_SCRIPT))
+                for name, amount, price in wellsfargo_parse_positions(rows):
+                    WELLSFARGO_o.set_holdings(
+                        key, account_masks[0], name, amount, price
+                    )
+                account_masks = []
+            for account_mask in account_masks:
+                dropdown.click()
+                account_item = page.locator("#dropdownlist1 li").filter(
+                    has_text=account_mask.replace("*", "")
+                )
+                if account_item.count() == 0:
+                    print(f"Could not find account {account_mask}")
+                    continue
+                old_table = page.locator("tbody").first.element_handle()
+                account_item.first.click()
+                # Wait for the new account's table to replace the old one
+                try:
+                    page.wait_for_function(
+                        "table => !table.isConnected", arg=old_table, timeout=1000
+                    )
+                except PlaywrightTimeoutError:
+                    pass
+                rows = page.evaluate(page_script(POSITIONS_SCRIPT))
+                for name, amount, price in wellsfargo_parse_positions(rows):
+                    WELLSFARGO_o.set_holdings(key, account_mask, name, amount, price)
+            timing_report.record(
+                "wellsfargo playwright holdings", perf_counter() - start, "ok"
+            )
+        except PlaywrightTimeoutError as e:
+            timing_report.record(
+                "wellsfargo playwright holdings", perf_counter() - start
+            )
+            wellsfargo_playwright_error(page, f"Could not get to holdings: {e}")
+    printHoldings(WELLSFARGO_o, loop)
+    wellsfargo_playwright_close(WELLSFARGO_o)
+
+
+def wellsfargo_playwright_open_ticket(page):
+    # Go to the stock trading ticket, dismissing the clear ticket prompt
+    page.locator("#trademenu span").first.click()
+    page.locator("#linktradestocks").click()
+    prompt = page.locator("#btn-continue")
+    prompt.or_(page.locator("#BuySellBtn")).first.wait_for(timeout=20000)
+    if prompt.is_visible():
+        prompt.click()
+
+
+def wellsfargo_playwright_transaction(
+    WELLSFARGO_o: Brokerage, orderObj: stockOrder, loop=None
+):
+    action = orderObj.get_action().lower()
+    for key in WELLSFARGO_o.get_account_numbers():
+        page = WELLSFARGO_o.get_logged_in_objects(key)["page"]
+        try:
+            page.locator("#BROKERAGE_LINK7P").click()
+            wellsfargo_playwright_open_ticket(page)
+        except PlaywrightTimeoutError as e:
+            wellsfargo_playwright_error(page, f"Could not get to trade: {e}")
+            continue
+        # Use to keep track of an order to know whether to reset the trading screen
+        order_failed = False
+        for account_mask in WELLSFARGO_o.get_account_numbers(key):
+            try:
+                if order_failed:
+                    wellsfargo_playwright_open_ticket(page)
+                    order_failed = False
+                page.locator("#dropdown2").click()
+                account_item = page.locator("#dropdownlist2 li").filter(
+                    has_text=account_mask.replace("*", "")
+                )
+                if account_item.count() == 0:
+                    print(f"Could not find account {account_mask}")
+                    continue
+                account_item.first.click()
+                prompt = page.locator("#btn-continue")
+                prompt.or_(page.locator("#BuySellBtn")).first.wait_for(timeout=20000)
+                if prompt.is_visible():
+                    prompt.click()
+            except PlaywrightTimeoutError as e:
+                wellsfargo_playwright_error(page, f"Could not change account: {e}")
+                order_failed = True
+                continue
+            for s in orderObj.get_stocks():
+                try:
+                    # If an order fails need to reset the trading screen
+                    if order_failed:
+                        wellsfargo_playwright_open_ticket(page)
+                    page.locator("#BuySellBtn").dispatch_event("click")
+                    page.get_by_role(
+                        "link", name=action.capitalize(), exact=True
+                    ).click()
+                    page.locator("#Symbol").fill(s)
+                    page.locator("#Symbol").press("Enter")
+                    page.locator("#OrderQuantity").evaluate(
+                        "(box, amount) => box.value = amount",
+                        str(int(orderObj.get_amount())),
+                    )
+                    price = float(page.locator(".qeval").inner_text())
+                    if action == "buy" and price < 2:
+                        price_type = "Limit"
+                        price += 0.01
+                    elif action == "sell" and price < 2:
+                        price_type = "Limit"
+                        price -= 0.01
+                    else:
+                        price_type = "Market"
+                    page.locator("#OrderTypeBtnText").dispatch_event("click")
+                    page.get_by_role("link", name=price_type, exact=True).click()
+                    if price_type == "Limit":
+                        page.locator("#Price").fill(str(price))
+                        page.locator("#Price").press("Enter")
+                        page.locator("#TIFBtn").dispatch_event("click")
+                        page.get_by_role("link", name="Day", exact=True).click()
+                    # preview
+                    page.locator("#actionbtnContinue").dispatch_event("click")
+                    if orderObj.get_dry():
+                        printAndDiscord(
+                            f"DRY: {key} account {account_mask}: {orderObj.get_action()} {orderObj.get_amount()} shares of {s}",
+                            loop,
+                        )
+                        order_failed = True
+                        continue
+                    submit = page.locator(".btn-wfa-submit")
+                    submit.wait_for(timeout=10000)
+                    submit.dispatch_event("click")
+                    printAndDiscord(
+                        f"{key} {account_mask}: {orderObj.get_action()} {orderObj.get_amount()} shares of {s}",
+                        loop,
+                    )
+                    # buy next
+                    page.locator(".btn-wfa-primary").dispatch_event("click")
+                    order_failed = False
+                except PlaywrightTimeoutError:
+                    order_failed = True
+                    error_text = page.locator("div.alert-msg-summary p").first
+                    printAndDiscord(
+                        f"{key} {account_mask}: {orderObj.get_action()} {orderObj.get_amount()} shares of {s}. FAILED! \n{error_text.inner_text() if error_text.count() else ''}",
+                        loop,
+                    )
+                    # Cancel the trade
+                    try:
+                        page.locator("#actionbtnCancel").dispatch_event("click")
+                        page.locator("#btn-continue").click(timeout=3000)
+                    except PlaywrightTimeoutError:
+                        pass
+    wellsfargo_playwright_close(WELLSFARGO_o)